@@ -1,8 +1,59 @@
 """
 Main application file for the School Bell application.
 """
-from main import SchoolBellApp
+import argparse
+import socket
+import sys
+from config import HEADLESS_SOCKET, HEADLESS_CONTROL_PORT
+
+
+def send_command(line):
+    """Send one command to a running headless instance and return its reply."""
+    if hasattr(socket, "AF_UNIX"):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        address = HEADLESS_SOCKET
+    else:
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        address = ("127.0.0.1", HEADLESS_CONTROL_PORT)
+    with sock:
+        sock.connect(address)
+        sock.sendall((line + "\n").encode("utf-8"))
+        return sock.makefile(encoding="utf-8").read().rstrip("\n")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Училищен звънец")
+    parser.add_argument("--headless", action="store_true",
+                        help="работи без графичен интерфейс; управлява се със сигнали или през локален сокет")
+    parser.add_argument("--send", metavar="КОМАНДА",
+                        help="изпраща команда на работещ --headless процес (напр. status, ring, stop)")
+    parser.add_argument("--profile-startup", action="store_true",
+                        help="отчита времето на всяка фаза при стартиране и затваря прозореца; "
+                             "изходен код 1, ако първият кадър надхвърли STARTUP_BUDGET_MS")
+    return parser.parse_args(argv)
+
 
 if __name__ == "__main__":
-    app = SchoolBellApp()
-    app.mainloop()
\ No newline at end of file
+    args = parse_args()
+    if args.send:
+        try:
+            print(send_command(args.send))
+        except OSError as e:
+            print(f"[ГРЕШКА] Няма връзка с работещ --headless процес: {e.strerror or e}", file=sys.stderr)
+            sys.exit(1)
+    elif args.headless:
+        # Imported lazily so neither mode pays for the other's modules (Tk is never loaded headless)
+        from headless import run_headless
+        run_headless()
+    else:
+        import startup_profile
+        if args.profile_startup:
+            startup_profile.enable()
+        from main import SchoolBellApp
+        startup_profile.mark("imports")
+        app = SchoolBellApp()
+        app.mainloop()
+        if args.profile_startup:
+            text, ok = startup_profile.report("first frame")
+            print(text)
+            sys.exit(0 if ok else 1)
@@ -0,0 +1,86 @@
+"""
+Decoded audio cache for the School Bell application.
+Keeps bell sounds decoded in RAM so a bell starts without opening or decoding a file.
+"""
+import os
+import threading
+from collections import OrderedDict
+from config import AUDIO_CACHE_MAX_BYTES, AUDIO_CACHE_MAX_FILE_BYTES
+from utils import log_message
+
+
+def _decoded_size(sound):
+    """Size in bytes of a decoded Sound, from its length and the mixer format."""
+    from pygame import mixer
+    frequency, size, channels = mixer.get_init()
+    return int(sound.get_length() * frequency * channels * abs(size) // 8)
+
+
+class AudioCache:
+    """LRU cache of pygame.mixer.Sound buffers with a total memory cap."""
+
+    def __init__(self, app=None, max_bytes=AUDIO_CACHE_MAX_BYTES, max_file_bytes=AUDIO_CACHE_MAX_FILE_BYTES):
+        self.app = app
+        self.max_bytes = max_bytes
+        self.max_file_bytes = max_file_bytes
+        self.size = 0
+        self._sounds = OrderedDict()  # path -> (mtime, Sound, decoded size)
+        self._too_large = {}          # path -> mtime of files that must be streamed
+        self._lock = threading.Lock()
+
+    def get(self, path):
+        """Return the cached Sound for `path`, decoding it if needed, or None to stream instead."""
+        try:
+            mtime = os.path.getmtime(path)
+        except OSError:
+            return None
+        with self._lock:
+            cached = self._sounds.get(path)
+            if cached and cached[0] == mtime:
+                self._sounds.move_to_end(path)
+                return cached[1]
+            if self._too_large.get(path) == mtime:
+                return None
+        return self._load(path, mtime)
+
+    def _load(self, path, mtime):
+        # Decoded audio is never smaller than the file, so skip obviously large files without decoding them
+        if os.path.getsize(path) > self.max_file_bytes:
+            self._too_large[path] = mtime
+            return None
+        from pygame import mixer
+        sound = mixer.Sound(path)
+        size = _decoded_size(sound)
+        with self._lock:
+            if size > self.max_file_bytes:
+                self._too_large[path] = mtime
+                return None
+            self._discard(path)
+            self._sounds[path] = (mtime, sound, size)
+            self.size += size
+            while self.size > self.max_bytes and len(self._sounds) > 1:
+                evicted, _ = next(iter(self._sounds.items()))
+                self._discard(evicted)
+        return sound
+
+    def _discard(self, path):
+        cached = self._sounds.pop(path, None)
+        if cached:
+            self.size -= cached[2]
+
+    def discard(self, path):
+        """Drop a file's decoded sound, e.g. once a transcoded copy is played instead."""
+        with self._lock:
+            self._discard(path)
+
+    def preload(self, paths):
+        """Decode the given files into the cache on a background thread."""
+        threading.Thread(target=self._preload, args=(list(paths),), daemon=True).start()
+
+    def _preload(self, paths):
+        for path in paths:
+            try:
+                self.get(path)
+            except Exception as e:
+                log_message(self.app, f"[ГРЕШКА] Неуспешно зареждане на '{os.path.basename(path)}' в паметта: {e}")
+        log_message(self.app, f"Звуци в паметта: {len(self._sounds)} ({self.size / 1024 / 1024:.1f} MB).")
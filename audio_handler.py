@@ -1,91 +1,227 @@
 """
 Audio handling functions for the School Bell application.
 """
-import os
-import random
-from pygame import mixer
-from config import RESOURCES_DIR
-from visual_notification import show_visual_bell_notification
+import threading
+from config import RESOURCES_DIR, AUDIO_INIT_TIMEOUT, ZONES
+from ducking import Ducker
 
 
-def set_volume(volume):
-    """Set the volume of the audio player."""
-    mixer.music.set_volume(float(volume))
-    # Note: This function is called from the main app to update the volume percentage label
-    # The volume percentage calculation happens in the main app
+PRIORITY_CHANNEL = len(ZONES)  # Mixer channel for manual bells and announcements, after the zone channels
 
+_volume = 0.5
+mixer = None  # pygame.mixer once init_audio() has opened the audio device
+_audio_ready = threading.Event()
+_ducker = None  # Lowers the zone channels while something plays on PRIORITY_CHANNEL
+_song_gain = {}  # channel -> loudness correction of the song playing on it
 
-def play_song(app, song_name=None):
-    """Play a song for scheduled bells."""
-    if app.quiet_mode.get():
-        # Still show visual notification even in quiet mode
-        show_visual_bell_notification(app)
-        return "CANCEL_JOB"
 
-    app.log_message("Време е за звънец! Търсене на песен...")
+def init_audio():
+    """Import pygame and open the audio device. Slow, so the GUI runs it off the Tk thread after the first paint."""
+    global mixer, _ducker
+    from pygame import mixer as pygame_mixer
+    pygame_mixer.init()
+    # Zone channels and the priority channel are only ever played on explicitly
+    pygame_mixer.set_num_channels(max(pygame_mixer.get_num_channels(), PRIORITY_CHANNEL + 1))
+    pygame_mixer.set_reserved(PRIORITY_CHANNEL + 1)
+    mixer = pygame_mixer
+    if _ducker is None:
+        _ducker = Ducker(_apply_zone_gain)
+    set_volume(_volume)
+    _audio_ready.set()
 
-    # Show visual notification
-    show_visual_bell_notification(app)
 
-    try:
-        song_list = [s for s in os.listdir(RESOURCES_DIR) if s.endswith((".mp3", ".wav", ".ogg"))]
-        if not song_list:
-            app.log_message(f"[ГРЕШКА] Няма песни в '{RESOURCES_DIR}'.")
-            return "CANCEL_JOB"
+def audio_ready():
+    """True once init_audio() has finished."""
+    return _audio_ready.is_set()
 
-        song_to_play = None
-        if song_name and song_name in song_list:
-            song_to_play = song_name
-        else:
-            song_to_play = random.choice(song_list)
 
-        local_path = os.path.join(RESOURCES_DIR, song_to_play)
+def close_audio():
+    global mixer
+    if mixer is not None:
+        mixer.quit()
+        mixer = None
+        _audio_ready.clear()
 
-        app.log_message(f"Пускане на '{song_to_play}'...")
-        mixer.music.load(local_path)
-        mixer.music.play()
 
-        while mixer.music.get_busy() and app.service_running:
-            import time
-            time.sleep(0.5)
+def _bell_channel(channel=0):
+    """Mixer channel of a zone; channel 0 is the primary zone, which may also stream through mixer.music."""
+    return mixer.Channel(channel)
 
-    except Exception as e:
-        app.log_message(f"[ГРЕШКА] Проблем при пускане на песен: {e}")
-    return "CANCEL_JOB"
+
+def _channel_volume(channel, duck_gain=1.0):
+    """
+    The user's volume times the loudness correction of the song on the channel (and the duck gain
+    for zones). Capped at 1.0, so a quiet song is boosted only as far as the volume setting allows.
+    """
+    return min(1.0, _volume * duck_gain * _song_gain.get(channel, 1.0))
+
+
+def _zone_volume(channel):
+    """Volume for a zone channel, lowered while a priority sound is ducking the zones."""
+    return _channel_volume(channel, _ducker.gain if _ducker else 1.0)
 
 
-def play_song_manual(app, song_name=None):
-    """Play a song for manual bells with stopping capability."""
+def _apply_zone_gain(gain):
+    if mixer is None:
+        return
+    mixer.music.set_volume(_channel_volume(0, gain))
+    for channel in range(PRIORITY_CHANNEL):
+        _bell_channel(channel).set_volume(_channel_volume(channel, gain))
+
+
+def set_volume(volume):
+    """Set the volume of the audio player."""
+    global _volume
+    _volume = float(volume)
+    if mixer is None:
+        return  # Applied by init_audio()
+    _apply_zone_gain(_ducker.gain if _ducker else 1.0)
+    _bell_channel(PRIORITY_CHANNEL).set_volume(_channel_volume(PRIORITY_CHANNEL))
+    # Note: This function is called from the main app to update the volume percentage label
+    # The volume percentage calculation happens in the main app
+
+
+def is_playing(channel=0):
+    """Return True while a bell is playing on a zone's channel (or streamed, for the primary zone)."""
+    if mixer is None:
+        return False
+    if channel == 0 and mixer.music.get_busy():
+        return True
+    return _bell_channel(channel).get_busy()
+
+
+def stop_playback(channel=None):
+    """Stop the bell playing on a zone's channel, or everything in every zone if channel is None."""
+    if mixer is None:
+        return
+    if channel is None:
+        mixer.music.stop()
+        mixer.stop()
+        if _ducker:
+            _ducker.release()
+        return
+    if channel == 0:
+        mixer.music.stop()
+    _bell_channel(channel).stop()
+
+
+class PreparedBell:
+    """A resolved song, decoded and ready to play. `sound` is None if it is streamed from disk."""
+    __slots__ = ("song", "path", "sound", "gain")
+
+    def __init__(self, song, path, sound, gain=1.0):
+        self.song = song
+        self.path = path
+        self.sound = sound
+        self.gain = gain  # Loudness correction, precomputed by the song library
+
+
+def prepare_bell(app, song_name=None, channel=0):
+    """
+    Resolve the song (picking the random one now) and decode it from the audio cache. Files too large
+    to cache are streamed from disk in the primary zone; mixer.music is a single stream, so other
+    channels decode them. Returns a PreparedBell, or None if there are no songs.
+    """
+    # A bell right after startup may arrive while the audio device is still opening
+    if not _audio_ready.wait(AUDIO_INIT_TIMEOUT):
+        raise RuntimeError("аудио устройството не е инициализирано")
+    song = _resolve_song(app, song_name)
+    if not song:
+        return None
+    path = app.song_library.playable_path(song)
+    sound = app.audio_cache.get(path)
+    if sound is None and channel != 0:
+        sound = mixer.Sound(path)
+    return PreparedBell(song, path, sound, app.song_library.gain(song))
+
+
+def _start_playback(bell, channel=0):
+    """Play a prepared bell on a zone's channel. Returns the sound's length in seconds, or None when streaming."""
+    stop_playback(channel)
+    _song_gain[channel] = bell.gain
+    if bell.sound is not None:
+        bell_channel = _bell_channel(channel)
+        bell_channel.play(bell.sound)
+        bell_channel.set_volume(_zone_volume(channel))
+        return bell.sound.get_length()
+    mixer.music.load(bell.path)
+    mixer.music.set_volume(_zone_volume(channel))
+    mixer.music.play()
+    return None
+
+
+def _start_priority(bell):
+    """Play a prepared bell on the priority channel at full volume, ducking every zone until it ends. Returns its length."""
+    _song_gain[PRIORITY_CHANNEL] = bell.gain
+    channel = _bell_channel(PRIORITY_CHANNEL)
+    channel.play(bell.sound)
+    channel.set_volume(_channel_volume(PRIORITY_CHANNEL))
+    _ducker.hold(bell.sound.get_length())
+    return bell.sound.get_length()
+
+
+def stop_priority():
+    """Stop the priority sound and bring the zones back up."""
+    if mixer is None:
+        return
+    _bell_channel(PRIORITY_CHANNEL).stop()
+    _ducker.release()
+
+
+def _resolve_song(app, song_name):
+    """Return the requested song if it exists in the library, otherwise a random one."""
+    if song_name and song_name in app.song_library:
+        return song_name
+    return app.song_library.choice()
+
+
+def start_bell(app, kind, song_name=None, scheduled_at=None, channel=0, prepared=None, fired_at=None):
+    """
+    Resolve a song and start it on a channel; PRIORITY_CHANNEL plays over the zones and ducks them.
+    Returns as soon as playback has begun.
+
+    Args:
+        kind (str): 'scheduled' or 'manual', for the bell metrics. Scheduled bells are silent in quiet mode.
+        prepared (PreparedBell): Bell armed ahead of time by prepare_bell(); only play() is left to do
+        fired_at (float): When the scheduler fired the bell, for the bell metrics; defaults to now
+
+    Returns:
+        (BellTiming, expected length in seconds or None if unknown), or (None, None) if nothing was played.
+        The caller finishes the timing once playback ends.
+    """
+    if kind == 'scheduled' and app.quiet_mode_enabled:
+        # Still show visual notification even in quiet mode
+        app.notify_bell()
+        return None, None
+
+    timing = app.bell_metrics.begin(kind, scheduled_at, fired_at)
     app.log_message("Време е за звънец! Търсене на песен...")
 
     # Show visual notification
-    show_visual_bell_notification(app)
+    app.notify_bell()
 
     try:
-        song_list = [s for s in os.listdir(RESOURCES_DIR) if s.endswith((".mp3", ".wav", ".ogg"))]
-        if not song_list:
+        bell = prepared or prepare_bell(app, song_name, channel)
+        if not bell:
             app.log_message(f"[ГРЕШКА] Няма песни в '{RESOURCES_DIR}'.")
-            return
+            return None, None
 
-        song_to_play = None
-        if song_name and song_name in song_list:
-            song_to_play = song_name
+        app.log_message(f"Пускане на '{bell.song}'...")
+        if channel == PRIORITY_CHANNEL:
+            length = _start_priority(bell)
         else:
-            song_to_play = random.choice(song_list)
-
-        local_path = os.path.join(RESOURCES_DIR, song_to_play)
+            length = _start_playback(bell, channel)
+        app.bell_metrics.mark_play(timing, bell.song)
+        if length is None:
+            # Streamed from disk: only the cheap header-based duration is known, if any
+            length = app.song_library.info(bell.song).duration
+        return timing, length
 
-        app.log_message(f"Пускане на '{song_to_play}'...")
-        mixer.music.load(local_path)
-        mixer.music.play()
+    except Exception as e:
+        app.log_message(f"[ГРЕШКА] Проблем при пускане на песен: {e}")
+        return None, None
 
-        # Wait for the music to finish or be stopped manually
-        while mixer.music.get_busy():
-            import time
-            time.sleep(0.5)
-            # Check if the button text has changed back to "Пусни звънеца сега" indicating stop was requested
-            if app.manual_ring_button.cget("text") == "Пусни звънеца сега":
-                break
 
-    except Exception as e:
-        app.log_message(f"[ГРЕШКА] Проблем при пускане на песен: {e}")
\ No newline at end of file
+def play_song(app, song_name=None, scheduled_at=None, channel=0):
+    """Start a song for scheduled bells on a zone's channel. Returns its BellTiming, or None if nothing was played."""
+    return start_bell(app, 'scheduled', song_name, scheduled_at, channel)[0]
@@ -0,0 +1,94 @@
+"""
+Background process pool for the School Bell application.
+Runs a job on one daemon thread at a time and farms its work out to a spawn-context process pool that close() can drop at once.
+"""
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+
+def _init_worker(initializer):
+    """Pool initializer: decoding only, so never open the sound card; then the caller's own setup."""
+    os.environ["SDL_AUDIODRIVER"] = "dummy"
+    if initializer:
+        initializer()
+
+
+class BackgroundPool:
+    """
+    One background job at a time, with worker processes only while it needs them.
+
+    run() starts the job on a daemon thread, or, if it is already running,
+    has it run once more when it finishes, so a burst of requests costs one
+    extra pass. The job hands its work to map(), which keeps the executor on
+    this object rather than in a with-block: close() can then cancel queued
+    work without waiting, and a daemon thread never holds the process open
+    at exit.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._thread = None
+        self._again = False     # run() was called while the job was running
+        self._pool = None       # ProcessPoolExecutor while the job is in map()
+        self.closed = False
+
+    def run(self, job, *args):
+        """Run job(*args) in the background. Never blocks; does nothing once closed."""
+        with self._lock:
+            if self.closed:
+                return
+            if self._thread and self._thread.is_alive():
+                self._again = True
+                return
+            self._thread = threading.Thread(target=self._loop, args=(job, args), daemon=True)
+            self._thread.start()
+
+    def _loop(self, job, args):
+        while True:
+            job(*args)
+            with self._lock:
+                if not self._again or self.closed:
+                    self._thread = None
+                    return
+                self._again = False
+
+    def map(self, function, tasks, workers, initializer=None):
+        """
+        Call function(*args) in worker processes for every key -> args in `tasks` and yield
+        (key, future) as each finishes. Stops early, and yields nothing more, once closed.
+        """
+        context = multiprocessing.get_context("spawn")  # A fresh interpreter, not a fork of the open audio device
+        with self._lock:
+            if self.closed:
+                return
+            pool = self._pool = ProcessPoolExecutor(workers, mp_context=context,
+                                                    initializer=_init_worker, initargs=(initializer,))
+        try:
+            futures = {pool.submit(function, *args): key for key, args in tasks.items()}
+            for future in as_completed(futures):
+                if self.closed:
+                    return
+                yield futures[future], future
+        finally:
+            with self._lock:
+                self._pool = None
+            if not self.closed:
+                pool.shutdown()
+
+    def close(self):
+        """Cancel queued work and start no new jobs. Never blocks."""
+        with self._lock:
+            self.closed = True
+            pool = self._pool
+        if pool:
+            # Calls already handed to the workers cannot be cancelled, and exit would wait for them
+            terminate = getattr(pool, "terminate_workers", None)  # Python 3.14+
+            if terminate:
+                terminate()
+                return
+            processes = list((pool._processes or {}).values())
+            pool.shutdown(wait=False, cancel_futures=True)
+            for process in processes:
+                process.terminate()
@@ -0,0 +1,132 @@
+"""
+Bell timing instrumentation for the School Bell application.
+Records when each bell was due, when it fired, when playback took it over, when audio started and when it ended.
+"""
+import csv
+import os
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from config import BELL_METRICS_FILE, BELL_METRICS_HISTORY
+
+FIELDNAMES = ['Вид', 'Песен', 'Планиран', 'Изпълнен', 'Старт на звука', 'Край', 'Закъснение (ms)', 'Старт на звука (ms)',
+              'Поет', 'Предаване (ms)']
+
+
+def _percentile(sorted_values, percent):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    rank = max(1, -(-len(sorted_values) * percent // 100))
+    return sorted_values[int(rank) - 1]
+
+
+def _fmt(ts):
+    return datetime.fromtimestamp(ts).strftime("%Y-%m-%d %H:%M:%S.%f")[:-3] if ts else ""
+
+
+class BellTiming:
+    """
+    Timestamps (time.time()) of a single bell: `fired_at` is when the scheduler fired it,
+    `started_at` when the playback controller began starting it.
+    """
+    __slots__ = ("kind", "song", "scheduled_at", "fired_at", "started_at", "play_returned_at", "ended_at")
+
+    def __init__(self, kind, scheduled_at, fired_at=None):
+        self.kind = kind
+        self.song = None
+        self.scheduled_at = scheduled_at
+        self.started_at = time.time()
+        self.fired_at = fired_at if fired_at is not None else self.started_at
+        self.play_returned_at = None
+        self.ended_at = None
+
+    @property
+    def fire_delay_ms(self):
+        return (self.fired_at - self.scheduled_at) * 1000
+
+    @property
+    def handoff_ms(self):
+        """From firing to the controller starting the bell: the worker queue and any overlap-policy wait."""
+        return (self.started_at - self.fired_at) * 1000
+
+    @property
+    def audio_start_ms(self):
+        return (self.play_returned_at - self.started_at) * 1000 if self.play_returned_at else None
+
+
+class BellMetrics:
+    """Collects bell timings, keeps recent ones for summaries and appends all of them to a CSV file."""
+
+    def __init__(self, path=BELL_METRICS_FILE, history=BELL_METRICS_HISTORY):
+        self.path = path
+        self.recent = deque(maxlen=history)
+        self.version = 0  # Bumped on every finished bell so the UI knows when to refresh
+        self._lock = threading.Lock()
+
+    def begin(self, kind, scheduled_at=None, fired_at=None):
+        """Start timing a bell. `kind` is 'scheduled' or 'manual'; `fired_at` defaults to now."""
+        timing = BellTiming(kind, scheduled_at, fired_at)
+        if scheduled_at is None:
+            timing.scheduled_at = timing.fired_at
+        return timing
+
+    @staticmethod
+    def mark_play(timing, song):
+        """Record that mixer play() has returned."""
+        timing.song = song
+        timing.play_returned_at = time.time()
+
+    def finish(self, timing):
+        """Record the end of playback and persist the timing."""
+        timing.ended_at = time.time()
+        with self._lock:
+            self.recent.append(timing)
+            self.version += 1
+            self._write(timing)
+
+    def _write(self, timing):
+        if not self.path:
+            return  # In-memory only, e.g. in the simulation harness
+        try:
+            new_file = not os.path.exists(self.path)
+            with open(self.path, mode='a', newline='', encoding='utf-8') as file:
+                writer = csv.writer(file)
+                if new_file:
+                    writer.writerow(FIELDNAMES)
+                audio_start = timing.audio_start_ms
+                writer.writerow([timing.kind, timing.song or "", _fmt(timing.scheduled_at), _fmt(timing.fired_at),
+                                 _fmt(timing.play_returned_at), _fmt(timing.ended_at), f"{timing.fire_delay_ms:.1f}",
+                                 f"{audio_start:.1f}" if audio_start is not None else "",
+                                 _fmt(timing.started_at), f"{timing.handoff_ms:.1f}"])
+        except OSError as e:
+            print(f"[LOG] [ГРЕШКА] при запис на {self.path}: {e}")
+
+    def summary(self):
+        """Return p50/p95/max of fire delay, hand-off and audio start latency in milliseconds."""
+        with self._lock:
+            timings = list(self.recent)
+        fire = sorted(t.fire_delay_ms for t in timings if t.kind == 'scheduled')
+        handoff = sorted(t.handoff_ms for t in timings if t.kind == 'scheduled')
+        audio = sorted(t.audio_start_ms for t in timings if t.audio_start_ms is not None)
+        return {
+            'count': len(timings),
+            'fire': (_percentile(fire, 50), _percentile(fire, 95), fire[-1] if fire else None),
+            'handoff': (_percentile(handoff, 50), _percentile(handoff, 95), handoff[-1] if handoff else None),
+            'audio': (_percentile(audio, 50), _percentile(audio, 95), audio[-1] if audio else None),
+        }
+
+    def summary_text(self):
+        """Human-readable summary for the status panel."""
+        summary = self.summary()
+        if not summary['count']:
+            return "Няма измервания."
+
+        def line(values):
+            if values[0] is None:
+                return "няма данни"
+            return f"p50 {values[0]:.0f} · p95 {values[1]:.0f} · max {values[2]:.0f} ms"
+
+        return (f"Закъснение: {line(summary['fire'])}\nПредаване: {line(summary['handoff'])}\n"
+                f"Старт на звука: {line(summary['audio'])}")
@@ -0,0 +1,209 @@
+"""
+Benchmark suite for the School Bell application.
+Times schedule loading and saving, next-bell lookup, engine registration and editor bulk operations
+on synthetic schedules, and writes the results as JSON so runs can be compared.
+
+Usage:
+    python benchmark.py [--sizes 10 100 1000 10000 100000] [--repeat 5]
+                        [--output benchmark_results.json] [--compare previous.json]
+"""
+import argparse
+import csv
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import tempfile
+import time
+from datetime import datetime
+from types import SimpleNamespace
+from config import BG_WEEKDAYS, DAYS_OF_WEEK
+from schedule_model import MINUTES_PER_DAY, Schedule
+from scheduler import BellEngine, update_next_bell_label
+from utils import read_schedule, save_schedule, _cache_path
+
+DEFAULT_SIZES = [10, 100, 1000, 10000, 100000]
+DEFAULT_OUTPUT = "benchmark_results.json"
+SONGS = ["begin.mp3", "end.mp3", "break.mp3", None]
+REGRESSION_RATIO = 1.25  # --compare flags paths at least this much slower than the previous run
+
+
+class _Var:
+    """Stand-in for a Tk variable."""
+
+    def __init__(self, value):
+        self.value = value
+
+    def get(self):
+        return self.value
+
+
+def write_synthetic_csv(path, rows, seed=0):
+    """
+    Write a schedule CSV with `rows` bells spread over the week.
+
+    A week has only 7 * 1440 distinct bell times, so larger sizes repeat
+    times and exercise the duplicate/conflict reporting as well.
+    """
+    rng = random.Random(seed)
+    slots = 7 * MINUTES_PER_DAY
+    if rows <= slots:
+        offsets = rng.sample(range(slots), rows)
+    else:
+        offsets = [rng.randrange(slots) for _ in range(rows)]
+    with open(path, "w", newline="", encoding="utf-8") as file:
+        writer = csv.writer(file)
+        writer.writerow(["Ден", "Час", "Песен"])
+        for offset in offsets:
+            day, minute = divmod(offset, MINUTES_PER_DAY)
+            writer.writerow([BG_WEEKDAYS[day], f"{minute // 60:02d}:{minute % 60:02d}", rng.choice(SONGS) or ""])
+
+
+def measure(fn, repeat, setup=None):
+    """Run fn() `repeat` times (after setup(), untimed) and return timings in milliseconds."""
+    timings = []
+    for _ in range(repeat):
+        args = (setup(),) if setup else ()
+        start = time.perf_counter()
+        fn(*args)
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def bench_size(rows, repeat, workdir):
+    """All benchmarks for one synthetic schedule size."""
+    path = os.path.join(workdir, f"schedule_{rows}.csv")
+    write_synthetic_csv(path, rows)
+
+    def cold_load():
+        if os.path.exists(_cache_path(path)):
+            os.remove(_cache_path(path))
+        return read_schedule(path)
+
+    results = {}
+    results["load_schedule.cold"] = measure(cold_load, repeat)
+    schedule = read_schedule(path)  # Leaves a valid sidecar cache for the warm load
+    results["load_schedule.cached"] = measure(lambda: read_schedule(path), repeat)
+    save_path = os.path.join(workdir, f"saved_{rows}.csv")
+    results["save_schedule"] = measure(lambda: save_schedule(schedule, save_path), repeat)
+
+    label_app = SimpleNamespace(service_running=True, schedule=schedule,
+                                zones=[SimpleNamespace(name="Основна", schedule=schedule)],
+                                next_bell_label=SimpleNamespace(configure=lambda **kwargs: None))
+    results["update_next_bell_label"] = measure(lambda: update_next_bell_label(label_app), repeat)
+
+    engine = BellEngine(None, on_fire=lambda entry, fire_ts, zone: None)
+    results["engine.load"] = measure(lambda: engine.load(schedule), repeat)
+    # One bell moved: the incremental path a live edit takes
+    changed = Schedule(schedule.entries[1:] + [schedule.entries[0].copy(minute=(schedule.entries[0].minute + 1) % MINUTES_PER_DAY)])
+    results["engine.apply"] = measure(lambda: (engine.load(schedule), engine.apply(changed)), repeat)
+
+    results["editor.bulk_copy_schedule"] = measure(lambda editor: _bulk_copy(editor), repeat,
+                                                   setup=lambda: _editor_state(schedule))
+    results["editor.bulk_edit_songs"] = measure(lambda editor: _bulk_edit(editor), repeat,
+                                                setup=lambda: _editor_state(schedule))
+    return schedule, results
+
+
+def _editor_state(schedule):
+    """The editor attributes the bulk operations read, without building any windows."""
+    return SimpleNamespace(
+        parent_app=SimpleNamespace(schedule=schedule),
+        temp_days=schedule.days(),
+        bulk_source_day_var=_Var(DAYS_OF_WEEK[0]),
+        bulk_target_day_vars={day: _Var(day) for day in DAYS_OF_WEEK[1:]},
+        bulk_edit_song_day_vars={day: _Var(day) for day in DAYS_OF_WEEK},
+        bulk_edit_song_var=_Var("end.mp3"),
+        selected_day_var=_Var(DAYS_OF_WEEK[0]),
+        editor_list=SimpleNamespace(refresh=lambda items=None: None, set_items=lambda items, scroll_to_top=False: None),
+        populate_editor=lambda scroll_to_top=False: None,
+    )
+
+
+def _bulk_copy(editor):
+    from schedule_editor import ScheduleEditorWindow
+    ScheduleEditorWindow.bulk_copy_schedule(editor)
+
+
+def _bulk_edit(editor):
+    from schedule_editor import ScheduleEditorWindow
+    ScheduleEditorWindow.bulk_edit_songs(editor)
+
+
+def summarize(timings):
+    return {
+        "min_ms": round(min(timings), 4),
+        "median_ms": round(statistics.median(timings), 4),
+        "mean_ms": round(statistics.fmean(timings), 4),
+        "max_ms": round(max(timings), 4),
+    }
+
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True, cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(sizes, repeat):
+    import schedule_editor  # Imported up front so the first editor benchmark does not time the import
+    results = []
+    with tempfile.TemporaryDirectory() as workdir:
+        for rows in sizes:
+            schedule, timings = bench_size(rows, repeat, workdir)
+            for name, values in timings.items():
+                results.append({"benchmark": name, "rows": rows, "entries": len(schedule.entries),
+                                "repeat": repeat, **summarize(values)})
+                print(f"{name:<28} {rows:>7} реда {results[-1]['median_ms']:>10.3f} мс (медиана)")
+    return {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "git_revision": git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+        },
+        "results": results,
+    }
+
+
+def compare(current, previous_path):
+    """Print the median change for every benchmark present in both runs. Returns the number of regressions."""
+    with open(previous_path, encoding="utf-8") as file:
+        previous = {(r["benchmark"], r["rows"]): r for r in json.load(file)["results"]}
+    regressions = 0
+    for result in current["results"]:
+        old = previous.get((result["benchmark"], result["rows"]))
+        if not old or not old["median_ms"]:
+            continue
+        ratio = result["median_ms"] / old["median_ms"]
+        flag = ""
+        if ratio >= REGRESSION_RATIO:
+            regressions += 1
+            flag = "  <-- по-бавно"
+        print(f"{result['benchmark']:<28} {result['rows']:>7} реда {old['median_ms']:>10.3f} -> {result['median_ms']:>10.3f} мс ({ratio:.2f}x){flag}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Бенчмаркове за графика на звънеца")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="брой редове в синтетичните графици")
+    parser.add_argument("--repeat", type=int, default=5, help="повторения на всеки бенчмарк")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help="JSON файл за резултатите")
+    parser.add_argument("--compare", metavar="JSON", help="резултати от предишно пускане за сравнение")
+    args = parser.parse_args(argv)
+
+    current = run(args.sizes, args.repeat)
+    with open(args.output, "w", encoding="utf-8") as file:
+        json.dump(current, file, ensure_ascii=False, indent=2)
+    print(f"Резултатите са записани в {args.output}.")
+    if args.compare:
+        return 1 if compare(current, args.compare) else 0
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
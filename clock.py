@@ -0,0 +1,76 @@
+"""
+Clocks for the bell engine.
+SystemClock is the real wall clock; SimulatedClock lets a test harness run days of bells in seconds.
+"""
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime
+
+
+class SystemClock:
+    """Wall-clock time and real waiting."""
+
+    def time(self):
+        return time.time()
+
+    def now(self):
+        return datetime.now()
+
+    def wait(self, event, timeout):
+        """Wait up to `timeout` seconds for `event`. Returns True if it was set."""
+        return event.wait(timeout)
+
+    def sleep(self, seconds):
+        time.sleep(seconds)
+
+
+class SimulatedClock:
+    """
+    Virtual clock that jumps forward instead of waiting.
+
+    Every wait or sleep by the engine advances simulated time by the full
+    timeout at once. Once `end` is reached the clock stops advancing, sets
+    `finished` and waits for real, so the engine idles until it is stopped.
+
+    The CPU time the calling thread spends between clock calls is added to
+    the simulated day it was spent on (`cpu_by_day`, seconds per date).
+    """
+
+    def __init__(self, start, end):
+        self._now = start.timestamp()
+        self.end = end.timestamp()
+        self.finished = threading.Event()
+        self.cpu_by_day = defaultdict(float)
+        self._cpu_mark = None
+
+    def time(self):
+        return self._now
+
+    def now(self):
+        return datetime.fromtimestamp(self._now)
+
+    def _advance(self, seconds):
+        if self.finished.is_set():
+            return False
+        cpu = time.thread_time()
+        if self._cpu_mark is not None:
+            self.cpu_by_day[self.now().date()] += cpu - self._cpu_mark
+        self._cpu_mark = cpu
+        if self._now + seconds >= self.end:
+            self._now = max(self._now, self.end)
+            self.finished.set()
+            return False
+        self._now += seconds
+        return True
+
+    def wait(self, event, timeout):
+        if event.is_set():
+            return True
+        if not self._advance(timeout):
+            return event.wait(0.05)
+        return False
+
+    def sleep(self, seconds):
+        if not self._advance(seconds):
+            time.sleep(0.001)
@@ -20,4 +20,81 @@ DAY_MAP_BG_TO_EN = {
     "Четвъртък": "thursday", "Петък": "friday", "Събота": "saturday", "Неделя": "sunday",
 }
 DAYS_OF_WEEK = list(DAY_MAP_BG_TO_EN.keys())
-BG_WEEKDAYS = ["Понеделник", "Вторник", "Сряда", "Четвъртък", "Петък", "Събота", "Неделя"]
\ No newline at end of file
+BG_WEEKDAYS = ["Понеделник", "Вторник", "Сряда", "Четвъртък", "Петък", "Събота", "Неделя"]
+
+# --- Scheduler ---
+SCHEDULER_MAX_WAIT = 60       # seconds; longest sleep before re-checking the wall clock
+SCHEDULER_SPIN_WINDOW = 0.02  # seconds before a bell when the engine switches to fine waiting
+MISSED_BELL_GRACE = 60        # seconds; bells later than this are logged as missed, not rung
+
+# --- Playback ---
+# What a scheduled bell does when another sound is still playing
+OVERLAP_PREEMPT = "preempt"  # stop the current sound and ring
+OVERLAP_QUEUE = "queue"      # ring after the current sound ends
+OVERLAP_SKIP = "skip"        # do not ring
+OVERLAP_POLICY = OVERLAP_PREEMPT  # default for zones that do not set their own, see ZONES
+# Busy-check interval, only for streamed files whose length is unknown
+PLAYBACK_END_CHECK_INTERVAL = 0.05  # seconds
+# Seconds before each bell to pick its song and load the sound, so at its time only play() runs; 0 turns it off
+BELL_PREROLL = 10
+
+# --- Bell timing metrics ---
+BELL_METRICS_FILE = "bell_timings.csv"
+BELL_METRICS_HISTORY = 500  # most recent bells kept in memory for the p50/p95/max summary
+
+# --- Audio cache ---
+AUDIO_CACHE_MAX_BYTES = 128 * 1024 * 1024      # total decoded audio kept in RAM
+AUDIO_CACHE_MAX_FILE_BYTES = 32 * 1024 * 1024  # larger sounds are streamed from disk instead
+
+# --- Transcoding ---
+TRANSCODE_DIR = "songs_cache"  # WAV copies of the songs at the mixer's sample rate, named by content hash
+TRANSCODE_WORKERS = 1          # conversion processes; they run at low priority
+TRANSCODE_RECHECK_INTERVAL = 60  # seconds between background checks for songs overwritten in place
+
+# --- Loudness normalisation ---
+LOUDNESS_FILE = "songs_loudness.json"  # measured loudness per song content hash
+LOUDNESS_TARGET_DBFS = -18.0           # every song is played as if it were this loud
+LOUDNESS_MIN_GAIN = 0.1
+LOUDNESS_MAX_GAIN = 4.0                # a boost is still capped by the headroom left by the volume slider
+
+# --- Song checks ---
+SONG_CHECK_WORKERS = 2  # processes that test-decode the scheduled songs after startup and every change
+
+# --- Schedule file watcher ---
+SCHEDULE_WATCH_DEBOUNCE = 0.5        # seconds the file must stay unchanged before it is reloaded
+SCHEDULE_WATCH_POLL_INTERVAL = 1.0   # seconds between checks when inotify is not available
+
+# --- Schedule persistence ---
+SCHEDULE_BACKUPS = 3        # previous versions kept as schedule.csv.bak1 .. .bak3
+SCHEDULE_CACHE_VERSION = 1  # bump when the compiled cache format changes
+
+# --- Logging ---
+LOG_MAX_LINES = 2000            # lines kept in the on-screen log
+LOG_FLUSH_INTERVAL_MS = 250     # how often queued messages are written to the on-screen log
+LOG_FILE = "school_bell.log"
+LOG_FILE_MAX_BYTES = 1024 * 1024
+LOG_FILE_BACKUPS = 5
+
+# --- UI dispatch ---
+UI_DISPATCH_INTERVAL_MS = 50  # how often updates posted by worker threads are applied to the UI
+
+# --- Headless mode ---
+HEADLESS_SOCKET = "school_bell.sock"  # Unix socket for control commands in --headless mode
+HEADLESS_CONTROL_PORT = 8765           # localhost TCP port used instead where Unix sockets are unavailable
+
+# --- Startup ---
+AUDIO_INIT_TIMEOUT = 10       # seconds a bell waits for the audio device opened in the background at startup
+STARTUP_BUDGET_MS = 1500      # time-to-first-frame budget checked by --profile-startup
+
+# --- Zones ---
+# Named zones, each with its own schedule file and its own mixer channel (0, 1, ... in this order).
+# All zones are driven by one engine and ring in parallel. The first zone is the primary one:
+# it is shown in the today panel, edited in the schedule editor and used for manual bells.
+# An optional third element sets the zone's overlap policy; without it the zone uses OVERLAP_POLICY.
+# Example: ZONES = [("Основна", "schedule.csv"), ("Прогимназия", "schedule_junior.csv", OVERLAP_QUEUE)]
+ZONES = [("Основна", SCHEDULE_FILE)]
+
+# --- Ducking ---
+DUCK_LEVEL = 0.25     # zone volume (fraction) while a manual bell or announcement plays over it
+DUCK_FADE_MS = 300    # length of the fade down and back up
+DUCK_STEPS = 15       # volume changes per fade; the curve is computed once at startup
@@ -0,0 +1,67 @@
+"""
+Ducking for the School Bell application.
+Lowers the zone channels while a priority sound (manual bell, announcement) plays over them and restores them smoothly.
+"""
+import math
+import threading
+import time
+from config import DUCK_LEVEL, DUCK_FADE_MS, DUCK_STEPS
+
+
+def duck_curve(level=DUCK_LEVEL, steps=DUCK_STEPS):
+    """Gains from 1.0 down to `level` along a raised cosine, index 0 = not ducked."""
+    return tuple(level + (1.0 - level) * (1 + math.cos(math.pi * i / steps)) / 2 for i in range(steps + 1))
+
+
+class Ducker:
+    """
+    Moves the zone gain along a precomputed curve on its own thread.
+
+    Nothing runs while the gain is steady; a fade is `steps` volume changes
+    spread over `fade_ms`. A new request mid-fade continues from the current
+    point of the curve, so ducking and restoring never jump.
+
+    Args:
+        apply_gain (callable): apply_gain(gain) sets the zone channels to volume * gain
+    """
+
+    def __init__(self, apply_gain, level=DUCK_LEVEL, fade_ms=DUCK_FADE_MS, steps=DUCK_STEPS):
+        self.apply_gain = apply_gain
+        self.curve = duck_curve(level, steps)
+        self.step_interval = fade_ms / 1000 / steps
+        self.position = 0      # Index into curve of the gain applied now
+        self._until = 0.0      # time.monotonic() at which the priority sound ends
+        self._wake = threading.Event()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    @property
+    def gain(self):
+        return self.curve[self.position]
+
+    def hold(self, seconds):
+        """Duck for the next `seconds`, then restore."""
+        self._until = time.monotonic() + seconds
+        self._wake.set()
+
+    def release(self):
+        """Restore now, e.g. when the priority sound is stopped early."""
+        self._until = 0.0
+        self._wake.set()
+
+    def _run(self):
+        last = len(self.curve) - 1
+        while True:
+            remaining = self._until - time.monotonic()
+            target = last if remaining > 0 else 0
+            if self.position == target:
+                self._wake.wait(remaining if target else None)
+                self._wake.clear()
+                continue
+            self.position += 1 if target > self.position else -1
+            try:
+                self.apply_gain(self.curve[self.position])
+            except Exception as e:
+                print(f"[LOG] [ГРЕШКА] при промяна на силата на звука: {e}")
+            self._wake.wait(self.step_interval)
+            self._wake.clear()
@@ -0,0 +1,255 @@
+"""
+Headless mode for the School Bell application.
+Runs the bell engine and audio player without importing Tk; controlled by signals or a local socket.
+"""
+import os
+import queue
+import signal
+import socket
+import socketserver
+import threading
+import time
+from datetime import datetime
+from config import RESOURCES_DIR, HEADLESS_SOCKET, HEADLESS_CONTROL_PORT, TRANSCODE_RECHECK_INTERVAL
+from audio_cache import AudioCache
+from audio_handler import PRIORITY_CHANNEL, set_volume, init_audio, close_audio
+from bell_metrics import BellMetrics
+from log_view import get_file_logger
+from playback_controller import PlaybackController
+from scheduler import start_engine, stop_engine
+from song_library import SongLibrary
+from transcode_cache import TranscodeCache
+from song_check import SongChecker
+from loudness import LoudnessCache
+from utils import log_message
+from zones import disarm_zones, preload_zone_songs, setup_zones, reload_zone, process_zone_reloads, stop_zone_watchers, stop_all_playback, zone_next_bells
+
+COMMANDS_HELP = "status | start | stop | ring [песен] | silence | quiet on|off | volume 0-1 | reload | shutdown"
+
+
+class ConsoleLog:
+    """Stand-in for the GUI log view: prints messages and writes them to the log file."""
+
+    def __init__(self):
+        self.file_logger = get_file_logger()
+
+    def append(self, msg):
+        print(f"[{datetime.now().strftime('%H:%M:%S')}] {msg}", flush=True)
+        self.file_logger.info(msg)
+
+
+class HeadlessBellApp:
+    """
+    The parts of SchoolBellApp the engine and audio player need, without any widgets.
+
+    Commands from signal handlers and the control socket are queued and run
+    on the main thread, the same way the GUI runs them on the Tk thread.
+    """
+
+    def __init__(self):
+        self.log_view = ConsoleLog()
+        self.quiet_mode_enabled = False
+        self.service_running = False
+        self.bell_engine = None
+        self.bell_metrics = BellMetrics()
+        self.song_checker = SongChecker()
+        self.volume = 0.5
+        self.commands = queue.SimpleQueue()  # (command line, reply queue or None); put() is safe in signal handlers
+        self.shutdown_event = threading.Event()
+        self.control_server = None
+
+        if not os.path.exists(RESOURCES_DIR):
+            os.makedirs(RESOURCES_DIR)
+        self.song_library = SongLibrary(transcodes=TranscodeCache(), loudness=LoudnessCache())
+
+        init_audio()
+        set_volume(self.volume)
+        self.audio_cache = AudioCache(self)
+        self.priority_playback = PlaybackController(self, PRIORITY_CHANNEL, kind='manual')
+
+        setup_zones(self)
+        self.sync_transcodes()
+
+    def log_message(self, msg):
+        log_message(self, msg)
+
+    def sync_transcodes(self):
+        self.song_library.transcodes.sync(self, self.song_library, on_done=self._transcodes_synced)
+
+    def _transcodes_synced(self, converted):
+        self.song_library.loudness.analyse(self, self.song_library)
+        if converted:
+            preload_zone_songs(self)
+
+    def notify_bell(self):
+        """No window to show; the bell is already in the log."""
+
+    def prepare_notification(self):
+        """Nothing to prepare without a window."""
+
+    def status_text(self):
+        lines = [f"услуга: {'РАБОТИ' if self.service_running else 'СПРЯН'}"]
+        for zone, next_bell in zone_next_bells(self, datetime.now()):
+            next_text = f"{next_bell.day_name} в {next_bell.time}" if next_bell and self.service_running else "--:--:--"
+            lines.append(f"зона {zone.name}: следващ звънец {next_text}, {len(zone.schedule.entries)} звънеца в графика, "
+                         f"{'свири' if zone.playback.is_busy() else 'тишина'}")
+        lines += [
+            f"ръчен звънец: {'свири' if self.priority_playback.is_busy() else 'тишина'}",
+            f"тих режим: {'да' if self.quiet_mode_enabled else 'не'}",
+            f"сила на звука: {int(self.volume * 100)}%",
+            self.bell_metrics.summary_text(),
+            f"песни в графика: {self.song_checker.summary_text()}",
+        ]
+        return "\n".join(lines)
+
+    def ring(self, song_name=None):
+        if self.quiet_mode_enabled:
+            log_message(self, "Ръчното пускане е спряно (Тих режим).")
+            return "[ГРЕШКА] Ръчното пускане е спряно (Тих режим)."
+        if self.priority_playback.is_busy():
+            return "[ГРЕШКА] Ръчният звънец вече свири."
+        if song_name and song_name not in self.song_library:
+            return f"[ГРЕШКА] Няма песен '{song_name}'."
+        self.priority_playback.play(song_name, datetime.now().timestamp())
+        return "OK"
+
+    def execute(self, line):
+        """Run one control command on the main thread and return the reply text."""
+        parts = line.split(maxsplit=1)
+        if not parts:
+            return COMMANDS_HELP
+        command, arg = parts[0].lower(), (parts[1].strip() if len(parts) > 1 else "")
+        if command == "status":
+            return self.status_text()
+        if command == "start":
+            if not self.service_running:
+                start_engine(self)
+            return "OK"
+        if command == "stop":
+            if self.service_running:
+                stop_engine(self)
+                log_message(self, "Услугата е спряна.")
+            return "OK"
+        if command == "ring":
+            return self.ring(arg or None)
+        if command == "silence":
+            stop_all_playback(self)
+            return "OK"
+        if command == "quiet" and arg in ("on", "off"):
+            self.quiet_mode_enabled = arg == "on"
+            if self.quiet_mode_enabled:
+                disarm_zones(self)
+            log_message(self, f"Тих режим: {'включен' if self.quiet_mode_enabled else 'изключен'}.")
+            return "OK"
+        if command == "volume":
+            try:
+                volume = float(arg)
+            except ValueError:
+                return "[ГРЕШКА] Силата на звука трябва да е число от 0 до 1."
+            self.volume = min(1.0, max(0.0, volume))
+            set_volume(self.volume)
+            return "OK"
+        if command == "reload":
+            for zone in self.zones:
+                reload_zone(self, zone)
+            return "OK"
+        if command == "shutdown":
+            self.shutdown_event.set()
+            return "OK"
+        return f"[ГРЕШКА] Непозната команда. {COMMANDS_HELP}"
+
+    def submit(self, line, wait=True):
+        """Queue a command for the main thread; with wait, block for its reply."""
+        reply = queue.SimpleQueue() if wait else None
+        self.commands.put((line, reply))
+        return reply.get() if wait else None
+
+    def install_signal_handlers(self):
+        """SIGTERM/SIGINT shut down, SIGHUP reloads, SIGUSR1 rings, SIGUSR2 toggles quiet mode."""
+        handlers = {
+            "SIGTERM": lambda: self.shutdown_event.set(),
+            "SIGINT": lambda: self.shutdown_event.set(),
+            "SIGHUP": lambda: self.submit("reload", wait=False),
+            "SIGUSR1": lambda: self.submit("ring", wait=False),
+            "SIGUSR2": lambda: self.submit(f"quiet {'off' if self.quiet_mode_enabled else 'on'}", wait=False),
+        }
+        for name, action in handlers.items():
+            signum = getattr(signal, name, None)  # Windows has only SIGINT/SIGTERM
+            if signum is not None:
+                signal.signal(signum, lambda *args, action=action: action())
+
+    def start_control_server(self):
+        """Listen for one-line commands on a Unix socket, or on localhost TCP where those are unavailable."""
+        app = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                line = self.rfile.readline().decode("utf-8", errors="replace").strip()
+                self.wfile.write((app.submit(line) + "\n").encode("utf-8"))
+
+        if hasattr(socket, "AF_UNIX"):
+            if os.path.exists(HEADLESS_SOCKET):
+                os.unlink(HEADLESS_SOCKET)  # Left behind by a process that did not shut down cleanly
+            self.control_server = socketserver.ThreadingUnixStreamServer(HEADLESS_SOCKET, Handler)
+            address = HEADLESS_SOCKET
+        else:
+            self.control_server = socketserver.ThreadingTCPServer(("127.0.0.1", HEADLESS_CONTROL_PORT), Handler)
+            address = f"127.0.0.1:{HEADLESS_CONTROL_PORT}"
+        self.control_server.daemon_threads = True
+        threading.Thread(target=self.control_server.serve_forever, daemon=True).start()
+        log_message(self, f"Команди се приемат на {address}.")
+
+    def run(self):
+        """Serve until shutdown: run queued commands, pick up schedule changes and new songs."""
+        self.install_signal_handlers()
+        self.start_control_server()
+        start_engine(self)
+        log_message(self, "Приложението работи без графичен интерфейс.")
+        song_recheck_at = time.monotonic() + TRANSCODE_RECHECK_INTERVAL
+        song_library_version = self.song_library.version
+        try:
+            while not self.shutdown_event.is_set():
+                try:
+                    line, reply = self.commands.get(timeout=1.0)
+                except queue.Empty:
+                    if time.monotonic() >= song_recheck_at:
+                        # The sync re-stats every song in the background; a change shows up as a new version
+                        song_recheck_at = time.monotonic() + TRANSCODE_RECHECK_INTERVAL
+                        self.sync_transcodes()
+                    self.song_library.refresh()
+                    if self.song_library.version != song_library_version:
+                        song_library_version = self.song_library.version
+                        self.song_checker.check(self)
+                        self.sync_transcodes()
+                    process_zone_reloads(self)
+                    continue
+                try:
+                    result = self.execute(line)
+                except Exception as e:
+                    result = f"[ГРЕШКА] {e}"
+                if reply is not None:
+                    reply.put(result)
+        finally:
+            self.close()
+
+    def close(self):
+        log_message(self, "Спиране...")
+        if self.control_server:
+            self.control_server.shutdown()
+            self.control_server.server_close()
+            if hasattr(socket, "AF_UNIX") and os.path.exists(HEADLESS_SOCKET):
+                os.unlink(HEADLESS_SOCKET)
+        stop_zone_watchers(self)
+        self.song_library.transcodes.close()
+        self.song_checker.close()
+        if self.service_running:
+            stop_engine(self)
+        stop_all_playback(self)
+        # Let the controllers finish with the mixer before it is closed
+        for playback in [zone.playback for zone in self.zones] + [self.priority_playback]:
+            playback.wait_idle(1)
+        close_audio()
+
+
+def run_headless():
+    HeadlessBellApp().run()
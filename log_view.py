@@ -0,0 +1,80 @@
+"""
+Log view for the School Bell application.
+Batches log messages into the log box on a timer, caps its length and mirrors everything to a rotating file.
+"""
+import atexit
+import logging
+import logging.handlers
+import queue
+from collections import deque
+from datetime import datetime
+from config import LOG_FILE, LOG_FILE_MAX_BYTES, LOG_FILE_BACKUPS, LOG_MAX_LINES, LOG_FLUSH_INTERVAL_MS
+
+
+def get_file_logger():
+    """
+    Logger that writes the full history to a size-rotated log file. Logging only queues
+    the record; a listener thread does the writes and rollovers, so a bell thread never waits on the disk.
+    """
+    logger = logging.getLogger("school_bell")
+    if not logger.handlers:
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+        try:
+            handler = logging.handlers.RotatingFileHandler(LOG_FILE, maxBytes=LOG_FILE_MAX_BYTES,
+                                                           backupCount=LOG_FILE_BACKUPS, encoding='utf-8')
+        except OSError as e:
+            print(f"[LOG] [ГРЕШКА] Не може да се отвори {LOG_FILE}: {e}")
+            handler = logging.NullHandler()
+        handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+        records = queue.SimpleQueue()
+        listener = logging.handlers.QueueListener(records, handler)
+        listener.start()
+        atexit.register(listener.stop)  # Writes out whatever is still queued
+        logger.addHandler(logging.handlers.QueueHandler(records))
+    return logger
+
+
+class LogView:
+    """
+    Ring buffer in front of the log Text widget.
+
+    Messages may be appended from any thread; they are written to the widget
+    in one batch per flush on the Tk thread, and the oldest lines are trimmed
+    so the widget never holds more than `max_lines`.
+    """
+
+    def __init__(self, app, text_widget, max_lines=LOG_MAX_LINES, flush_interval=LOG_FLUSH_INTERVAL_MS):
+        self.app = app
+        self.text_widget = text_widget
+        self.max_lines = max_lines
+        self.flush_interval = flush_interval
+        self.pending = deque(maxlen=max_lines)  # Messages not yet shown; older ones drop off if a batch overflows
+        self.lines = 0
+        self.file_logger = get_file_logger()
+        self.app.after(self.flush_interval, self.flush)
+
+    def append(self, msg):
+        """Queue a message for the log box and the log file. Only appends in memory, so it is safe on the bell path."""
+        self.pending.append((datetime.now().strftime("%H:%M:%S"), msg))
+        self.file_logger.info(msg)
+
+    def flush(self):
+        """Write all queued messages to the widget in one batch."""
+        batch = []
+        while self.pending:
+            batch.append(self.pending.popleft())
+        if batch:
+            widget = self.text_widget
+            widget.config(state="normal")
+            for now, msg in batch:
+                widget.insert("end", f"[{now}] ", 'timestamp')
+                widget.insert("end", f"{msg}\n", 'message')
+            self.lines += len(batch)
+            if self.lines > self.max_lines:
+                excess = self.lines - self.max_lines
+                widget.delete("1.0", f"{excess + 1}.0")
+                self.lines = self.max_lines
+            widget.config(state="disabled")
+            widget.see("end")
+        self.app.after(self.flush_interval, self.flush)
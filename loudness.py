@@ -0,0 +1,121 @@
+"""
+Loudness normalisation for the School Bell application.
+Measures each song once in the background and keeps a gain per content hash, so every bell rings at about the same level.
+"""
+import json
+import math
+import threading
+import wave
+from config import LOUDNESS_FILE, LOUDNESS_TARGET_DBFS, LOUDNESS_MIN_GAIN, LOUDNESS_MAX_GAIN
+from utils import _atomic_write, log_message
+
+BLOCK_SECONDS = 0.4       # Measurement block, as in EBU R128
+ABSOLUTE_GATE_DBFS = -70  # Blocks quieter than this are silence
+RELATIVE_GATE_DB = -10    # Blocks this far below the average are pauses, not programme
+
+
+def measure_loudness(samples, frequency, channels):
+    """
+    Gated RMS loudness in dBFS of interleaved 16-bit samples (a NumPy int16 array),
+    the EBU R128 gating without its frequency weighting. None for silence.
+    """
+    import numpy
+    frames = samples[:len(samples) - len(samples) % channels].reshape(-1, channels).astype(numpy.float64) / 32768.0
+    block = max(1, int(frequency * BLOCK_SECONDS))
+    count = len(frames) // block
+    if count == 0:
+        return None
+    power = (frames[:count * block] ** 2).reshape(count, block, channels).mean(axis=(1, 2))
+    power = power[power > 10 ** (ABSOLUTE_GATE_DBFS / 10)]
+    if not len(power):
+        return None
+    power = power[power > power.mean() * 10 ** (RELATIVE_GATE_DB / 10)]
+    return 10 * math.log10(power.mean())
+
+
+def _read_samples(path):
+    """(int16 samples, frequency, channels) of a file, straight from disk for 16-bit WAV, else via the mixer."""
+    import numpy
+    if path.lower().endswith(".wav"):
+        try:
+            with wave.open(path, 'rb') as wav:
+                if wav.getsampwidth() == 2:
+                    return (numpy.frombuffer(wav.readframes(wav.getnframes()), dtype='<i2'),
+                            wav.getframerate(), wav.getnchannels())
+        except (wave.Error, EOFError):
+            pass
+    from pygame import mixer
+    frequency, _, channels = mixer.get_init()
+    return numpy.frombuffer(mixer.Sound(path).get_raw(), dtype=numpy.int16), frequency, channels
+
+
+class LoudnessCache:
+    """
+    Loudness of every song, keyed by content hash and stored in LOUDNESS_FILE.
+
+    analyse() measures only songs whose hash is not known yet and is meant to
+    run on a background thread; gain() is a dictionary lookup, so nothing is
+    measured on the way to a bell.
+    """
+
+    def __init__(self, path=LOUDNESS_FILE):
+        self.path = path
+        self._loudness = {}  # song hash -> dBFS, or None for silence
+        self._gains = {}     # song hash -> volume multiplier
+        self._lock = threading.Lock()
+        self._numpy_missing_logged = False
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, mode='r', encoding='utf-8') as file:
+                loudness = json.load(file)
+        except (OSError, ValueError):
+            return
+        self._set(loudness)
+
+    def _set(self, loudness):
+        self._loudness = loudness
+        self._gains = {song_hash: self._gain_for(value) for song_hash, value in loudness.items()}
+
+    @staticmethod
+    def _gain_for(loudness):
+        if loudness is None:
+            return 1.0
+        gain = 10 ** ((LOUDNESS_TARGET_DBFS - loudness) / 20)
+        return min(LOUDNESS_MAX_GAIN, max(LOUDNESS_MIN_GAIN, gain))
+
+    def gain(self, info):
+        """Volume multiplier that brings a song to LOUDNESS_TARGET_DBFS; 1.0 until it has been measured."""
+        return self._gains.get(info.known_hash, 1.0)
+
+    def analyse(self, app, library):
+        """Measure new or changed songs and save the results. Blocks; call it off the Tk thread."""
+        with self._lock:
+            try:
+                import numpy  # noqa: F401
+            except ImportError:
+                if not self._numpy_missing_logged:
+                    self._numpy_missing_logged = True
+                    log_message(app, "[ИНФО] NumPy не е инсталиран; силата на звука на песните не се изравнява.")
+                return
+            infos = [info for info in map(library.info, library.names()) if info]
+            loudness = {info.hash: self._loudness[info.hash] for info in infos if info.hash in self._loudness}
+            todo = [info for info in infos if info.hash not in loudness]
+            if not todo and len(loudness) == len(self._loudness):
+                return
+            for info in todo:
+                try:
+                    loudness[info.hash] = measure_loudness(*_read_samples(library.playable_path(info.name)))
+                except Exception as e:
+                    log_message(app, f"[ГРЕШКА] Силата на звука на '{info.name}' не може да бъде измерена: {e}")
+                    continue
+                value = loudness[info.hash]
+                log_message(app, f"Сила на звука на '{info.name}': "
+                                 f"{'тишина' if value is None else f'{value:.1f} dBFS'}, "
+                                 f"корекция x{self._gain_for(value):.2f}")
+            self._set(loudness)
+            try:
+                _atomic_write(self.path, lambda file: json.dump(loudness, file, indent=1))
+            except OSError as e:
+                log_message(app, f"[ГРЕШКА] при запис на {self.path}: {e}")
@@ -7,16 +7,24 @@ import threading
 import time
 from tkinter import *
 import os
-from pygame import mixer
 from datetime import datetime
-from config import APP_NAME, WIDTH, HEIGHT, RESOURCES_DIR, SCHEDULE_FILE
-from utils import load_schedule, save_schedule, log_message
+from config import APP_NAME, WIDTH, HEIGHT, RESOURCES_DIR, BG_WEEKDAYS, GREEN, RED, TRANSCODE_RECHECK_INTERVAL
+from schedule_model import minute_of_week
+from utils import log_message
 from ui_components import setup_left_panel, setup_center_panel, setup_right_panel
-from audio_handler import set_volume, play_song, play_song_manual
-from scheduler import start_service, stop_service, run_scheduler, update_next_bell_label
+from audio_handler import PRIORITY_CHANNEL, set_volume, init_audio
+from scheduler import start_service, stop_service, update_next_bell_label
 from manual_handler import manual_ring
-from schedule_editor import ScheduleEditorWindow
-from about_dialog import AboutDialog
+from bell_metrics import BellMetrics
+from audio_cache import AudioCache
+from playback_controller import PlaybackController
+from song_library import SongLibrary
+from transcode_cache import TranscodeCache
+from song_check import SongChecker
+from loudness import LoudnessCache
+from zones import disarm_zones, setup_zones, set_zone_schedule, preload_zone_songs, reload_zone, apply_zone_to_service, process_zone_reloads, stop_zone_watchers
+from ui_dispatch import UIDispatcher
+import startup_profile
 
 
 class SchoolBellApp(customtkinter.CTk):
@@ -27,17 +35,30 @@ class SchoolBellApp(customtkinter.CTk):
         self.resizable(True, True)
         customtkinter.set_appearance_mode("dark")
         self.protocol("WM_DELETE_WINDOW", self.on_closing)
+        startup_profile.mark("window")
         self.editor_window = None
         self.songs_window = None
-        self.last_csv_mod_time = 0
         self.quiet_mode = customtkinter.BooleanVar()
-        self.manual_ring_playing_thread = None # New attribute to track manual play thread
+        # Plain mirror of quiet_mode that worker threads can read without touching Tk
+        self.quiet_mode_enabled = False
+        self.quiet_mode.trace_add("write", lambda *args: self.on_quiet_mode_changed())
+        self.ui = UIDispatcher(self)
+        self.startup_finished = False  # Set once the background audio initialisation is done
+        self.bell_metrics = BellMetrics()
+        self.bell_metrics_version = -1
+        self.song_checker = SongChecker()
+        self.song_checker_version = -1
+        self.schedule_display_key = None  # (weekday, schedule) currently shown in the today panel
+        self.schedule_display_highlight = None
 
         if not os.path.exists(RESOURCES_DIR):
             os.makedirs(RESOURCES_DIR)
 
         # Initialize song list
-        self.song_list = ["Случайна"] + [s for s in os.listdir(RESOURCES_DIR) if s.endswith((".mp3", ".wav", ".ogg"))]
+        self.song_library = SongLibrary(transcodes=TranscodeCache(), loudness=LoudnessCache())
+        self.song_list = ["Случайна"] + self.song_library.names()
+        self.song_library_version = self.song_library.version
+        self.song_recheck_at = time.monotonic() + TRANSCODE_RECHECK_INTERVAL
 
         self.grid_columnconfigure(0, weight=1)
         self.grid_columnconfigure(1, weight=2)
@@ -47,45 +68,76 @@ class SchoolBellApp(customtkinter.CTk):
         self.setup_left_panel()
         self.setup_center_panel()
         self.setup_right_panel()
+        startup_profile.mark("panels")
 
         self.service_running = False
-        self.scheduler_thread = None
-        mixer.init()
-        mixer.music.set_volume(0.5) # Set default volume
-
-        self.bell_times = load_schedule()
+        self.bell_engine = None
+        set_volume(0.5) # Set default volume; applied once the audio device is open
+        self.audio_cache = AudioCache(self)
+        # Manual bells play over the zones on their own channel
+        self.priority_playback = PlaybackController(self, PRIORITY_CHANNEL, kind='manual')
+
+        setup_zones(self)
+        startup_profile.mark("schedule")
         log_message(self, "Приложението е готово. Натиснете 'СТАРТ'.")
 
         self.start_ui_update_loops()
+        startup_profile.mark("ui loops")
+        # Opening the audio device is slow, so it waits until the window has been drawn
+        self.after(0, self.on_first_frame)
+
+    def on_first_frame(self):
+        self.update_idletasks()
+        startup_profile.mark("first frame")
+        threading.Thread(target=self.init_audio, daemon=True).start()
+
+    def init_audio(self):
+        """Import pygame and open the audio device on a background thread, then warm the audio cache."""
+        try:
+            init_audio()
+            startup_profile.mark("audio", group="audio")
+            preload_zone_songs(self)
+            self.song_checker.check(self)
+            self.sync_transcodes()
+        except Exception as e:
+            log_message(self, f"[ГРЕШКА] Аудио устройството не може да бъде инициализирано: {e}")
+        self.startup_finished = True
 
     def start_ui_update_loops(self):
+        if self.startup_finished and startup_profile.enabled():
+            # --profile-startup: everything has been measured, app.py prints the report
+            self.on_closing()
+            return
         # Update digital clock
         self.update_digital_clock()
         # Update schedule display
         self.populate_schedule_display()
         # Update next bell label
         self.update_next_bell_label()
-
-        # Check for external CSV changes
-        try:
-            mod_time = os.path.getmtime(SCHEDULE_FILE)
-            if self.last_csv_mod_time != 0 and mod_time != self.last_csv_mod_time:
-                log_message(self, "Открита е промяна в schedule.csv. Презареждане...")
-                self.reload_schedule_from_csv()
-            self.last_csv_mod_time = mod_time
-        except FileNotFoundError:
-            pass # Handled by load_schedule
+        # Update bell timing summary
+        self.update_bell_metrics_label()
+        # Show the result of the latest scheduled song check
+        self.update_song_check_label()
+        # Pick up songs added to or removed from the songs directory
+        self.update_song_list()
+        # Show UI dispatcher queue depth and latency
+        self.ui_dispatch_label.configure(text=self.ui.stats_text())
+
+        # Apply external CSV changes found by the schedule watcher
+        self.process_schedule_reloads()
 
         # Schedule next update
         self.after(1000, self.start_ui_update_loops)
 
-    def reload_schedule_from_csv(self):
-        self.bell_times = load_schedule()
-        log_message(self, "Програмата е презаредена от CSV файла.")
-        if self.service_running:
-            log_message(self, "Рестартиране на услугата с новата програма...")
-            self.stop_service()
-            self.start_service()
+    def set_schedule(self, schedule):
+        """Replace the primary zone's compiled schedule and report any problems found while compiling it."""
+        set_zone_schedule(self, self.zones[0], schedule)
+
+    def process_schedule_reloads(self):
+        process_zone_reloads(self)
+
+    def reload_schedule_from_csv(self, schedule=None):
+        reload_zone(self, self.zones[0], schedule)
 
     def setup_left_panel(self):
         setup_left_panel(self)
@@ -105,52 +157,109 @@ class SchoolBellApp(customtkinter.CTk):
     def manual_ring(self):
         manual_ring(self)
 
-    def _play_manual_bell(self, song_name=None):
-        play_song_manual(self, song_name=song_name)
-        # Only reset button if music wasn't stopped externally
-        if self.manual_ring_button.cget("text") == "Спри звънеца":
-            self.after(0, self._reset_manual_ring_button)
-
-    def _reset_manual_ring_button(self):
-        self.manual_ring_button.configure(text="Пусни звънеца сега", fg_color=customtkinter.ThemeManager.theme["CTkButton"]["fg_color"])
-        self.manual_ring_playing_thread = None
-        log_message(self, "Ръчен звънец приключи.")
-
     def update_digital_clock(self):
         self.digital_clock_label.configure(text=datetime.now().strftime("%H:%M:%S"))
 
     def populate_schedule_display(self):
-        for widget in self.schedule_display_frame.winfo_children():
-            widget.destroy()
-        from config import BG_WEEKDAYS
-        today_weekday_bg = BG_WEEKDAYS[datetime.now().weekday()]
-        self.schedule_display_title.configure(text=f"Програма за {today_weekday_bg}:")
-        todays_bells = sorted([entry for entry in self.bell_times if entry['day'] == today_weekday_bg], key=lambda x: x['time'])
-        if not todays_bells:
-            customtkinter.CTkLabel(self.schedule_display_frame, text="Няма звънци за днес.").pack(pady=10, padx=10)
+        """Refresh the today panel, touching widgets only when the day, the schedule or the next bell changes."""
+        now = datetime.now()
+        today_weekday = now.weekday()
+        if self.schedule_display_key != (today_weekday, self.schedule):
+            self.schedule_display_key = (today_weekday, self.schedule)
+            self.schedule_display_highlight = None
+            self.render_schedule_display(today_weekday)
+
+        # Highlight the next bell in place
+        next_bell = self.schedule.next_after(now)
+        highlight = None
+        if next_bell is not None and next_bell.day == today_weekday and next_bell.offset > minute_of_week(now):
+            highlight = self.schedule.day(today_weekday).index(next_bell)
+        if highlight != self.schedule_display_highlight:
+            default_color = customtkinter.ThemeManager.theme["CTkLabel"]["text_color"]
+            if self.schedule_display_highlight is not None:
+                self.schedule_display_labels[self.schedule_display_highlight].configure(text_color=default_color, font=self.schedule_display_font)
+            if highlight is not None:
+                self.schedule_display_labels[highlight].configure(text_color=GREEN, font=self.schedule_display_next_font)
+            self.schedule_display_highlight = highlight
+
+    def render_schedule_display(self, today_weekday):
+        self.schedule_display_title.configure(text=f"Програма за {BG_WEEKDAYS[today_weekday]}:")
+        todays_bells = self.schedule.day(today_weekday)
+        labels = self.schedule_display_labels
+        default_color = customtkinter.ThemeManager.theme["CTkLabel"]["text_color"]
+
+        # Reuse existing labels; create or destroy only the difference in row count
+        while len(labels) < len(todays_bells):
+            labels.append(customtkinter.CTkLabel(self.schedule_display_frame, font=self.schedule_display_font))
+            labels[-1].pack(pady=5, padx=10, anchor="w")
+        while len(labels) > len(todays_bells):
+            labels.pop().destroy()
+        for label, entry in zip(labels, todays_bells):
+            song_display = entry.song if entry.song else "Случайна"
+            label.configure(text=f"{entry.time} ({song_display})", text_color=default_color, font=self.schedule_display_font)
+
+        if todays_bells:
+            self.schedule_display_empty_label.pack_forget()
         else:
-            for entry in todays_bells:
-                song_display = entry.get('song') if entry.get('song') else "Случайна"
-                customtkinter.CTkLabel(self.schedule_display_frame, text=f"{entry['time']} ({song_display})", font=customtkinter.CTkFont(size=14)).pack(pady=5, padx=10, anchor="w")
+            self.schedule_display_empty_label.pack(pady=10, padx=10)
+
+    def update_song_list(self):
+        self.song_library.refresh()
+        if time.monotonic() >= self.song_recheck_at:
+            # The sync re-stats every song in the background; a change shows up here as a new version
+            self.song_recheck_at = time.monotonic() + TRANSCODE_RECHECK_INTERVAL
+            self.sync_transcodes()
+        if self.song_library.version != self.song_library_version:
+            self.song_library_version = self.song_library.version
+            self.song_list = ["Случайна"] + self.song_library.names()
+            self.manual_song_dropdown.configure(values=self.song_list)
+            if self.manual_song_var.get() not in self.song_list:
+                self.manual_song_var.set(self.song_list[0])
+            log_message(self, "Списъкът с песни е обновен.")
+            self.song_checker.check(self)
+            self.sync_transcodes()
+
+    def sync_transcodes(self):
+        """Convert and measure new or changed songs in the background; the scheduled ones are reloaded from the copies."""
+        self.song_library.transcodes.sync(self, self.song_library, on_done=self._transcodes_synced)
+
+    def _transcodes_synced(self, converted):
+        # Runs on the transcoding thread; measuring prefers the fresh WAV copies over decoding MP3 again
+        self.song_library.loudness.analyse(self, self.song_library)
+        if converted:
+            preload_zone_songs(self)
+
+    def update_bell_metrics_label(self):
+        # Only recompute percentiles when a new bell has been recorded
+        if self.bell_metrics.version != self.bell_metrics_version:
+            self.bell_metrics_version = self.bell_metrics.version
+            self.bell_metrics_label.configure(text=self.bell_metrics.summary_text())
+
+    def update_song_check_label(self):
+        if self.song_checker.version != self.song_checker_version:
+            self.song_checker_version = self.song_checker.version
+            self.song_check_label.configure(text=self.song_checker.summary_text(),
+                                            text_color=RED if self.song_checker.problems else GREEN)
+            if self.editor_window is not None and self.editor_window.winfo_exists():
+                self.editor_window.editor_list.refresh()  # Same entries, so only a re-bind redraws the markers
 
     def open_schedule_editor(self):
         if self.editor_window is None or not self.editor_window.winfo_exists():
+            from schedule_editor import ScheduleEditorWindow
             self.editor_window = ScheduleEditorWindow(self)
             self.editor_window.grab_set()
         else:
             self.editor_window.focus()
 
     def show_about(self):
+        from about_dialog import AboutDialog
         AboutDialog(self)
 
     def update_schedule(self, new_schedule):
-        self.bell_times = new_schedule
-        save_schedule(new_schedule)
+        self.set_schedule(new_schedule)
+        self.zones[0].watcher.save(new_schedule)
         log_message(self, "Програмата беше обновена.")
-        if self.service_running:
-            log_message(self, "Рестартиране на услугата с новата програма...")
-            self.stop_service()
-            self.start_service()
+        apply_zone_to_service(self, self.zones[0])
 
     def log_message(self, msg):
         log_message(self, msg)
@@ -167,16 +276,28 @@ class SchoolBellApp(customtkinter.CTk):
     def stop_service(self):
         stop_service(self)
 
-    def run_scheduler(self):
-        run_scheduler(self)
-
     def update_next_bell_label(self):
         update_next_bell_label(self)
 
-    def play_song(self, song_name=None):
-        return play_song(self, song_name)
+    def on_quiet_mode_changed(self):
+        self.quiet_mode_enabled = self.quiet_mode.get()
+        if self.quiet_mode_enabled:
+            disarm_zones(self)
+
+    def prepare_notification(self):
+        """Get the visual bell notification ready ahead of a bell. Safe to call from any thread."""
+        from visual_notification import prepare_visual_bell_notification
+        self.ui.post(prepare_visual_bell_notification, self, key="bell_notification_prepare")
+
+    def notify_bell(self):
+        """Show the visual bell notification. Safe to call from any thread."""
+        from visual_notification import show_visual_bell_notification
+        self.ui.post(show_visual_bell_notification, self, key="bell_notification")
 
     def on_closing(self):
+        stop_zone_watchers(self)
+        self.song_library.transcodes.close()
+        self.song_checker.close()
         if self.service_running:
             self.stop_service()
         if self.editor_window:
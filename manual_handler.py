@@ -1,9 +1,8 @@
 """
 Manual bell handling functions for the School Bell application.
 """
-import threading
+import time
 import customtkinter
-from pygame import mixer
 from utils import log_message
 
 
@@ -13,13 +12,10 @@ def manual_ring(app):
         log_message(app, "Ръчното пускане е спряно (Тих режим).")
         return
         
-    # Check if currently playing by looking at button text
-    if app.manual_ring_button.cget("text") == "Спри звънеца":
-        # Music is currently playing, so stop it
-        if mixer.music.get_busy():
-            mixer.music.stop()
+    if app.priority_playback.is_busy():
+        # Music is currently playing, so stop it; the controller reports back when it is silent
+        app.priority_playback.stop()
         log_message(app, "Ръчното пускане е спряно.")
-        _reset_manual_ring_button(app)
     else:
         # Start new playback
         app.manual_ring_button.configure(text="Спри звънеца", fg_color="#E84545")
@@ -29,32 +25,21 @@ def manual_ring(app):
         selected_song = app.manual_song_var.get()
         if selected_song == "Случайна":
             selected_song = None
-            
-        app.manual_ring_playing_thread = threading.Thread(
-            target=app._play_manual_bell, 
-            args=(selected_song,), 
-            daemon=True
-        )
-        app.manual_ring_playing_thread.start()
-        app.after(100, _check_manual_ring_thread, app)
-
 
-def _check_manual_ring_thread(app):
-    """Check if the manual ring thread is still running."""
-    if app.manual_ring_playing_thread and app.manual_ring_playing_thread.is_alive():
-        app.after(100, _check_manual_ring_thread, app)
-    else:
-        # Thread is no longer alive, ensure button is reset if needed
-        if app.manual_ring_button.cget("text") == "Спри звънеца": # Only reset if still showing playing status
-            _reset_manual_ring_button(app)
+        app.priority_playback.play(
+            selected_song, time.time(),
+            on_finished=lambda: app.ui.post(_reset_manual_ring_button, app, key="manual_ring_finished")
+        )
 
 
 def _reset_manual_ring_button(app):
     """Reset the manual ring button to its original state."""
+    # Another manual bell may have started since this one ended
+    if app.priority_playback.is_busy():
+        return
     # Reset to default color using theme manager
     app.manual_ring_button.configure(
         text="Пусни звънеца сега",
         fg_color=customtkinter.ThemeManager.theme["CTkButton"]["fg_color"]
     )
-    app.manual_ring_playing_thread = None
-    log_message(app, "Ръчен звънец приключи.")
\ No newline at end of file
+    log_message(app, "Ръчен звънец приключи.")
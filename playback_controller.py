@@ -0,0 +1,153 @@
+"""
+Playback controller for the School Bell application.
+Owns one mixer channel and plays one bell at a time on it, for scheduled and manual rings alike.
+"""
+import threading
+import time
+from audio_handler import PRIORITY_CHANNEL, prepare_bell, start_bell, is_playing, stop_playback, stop_priority
+from config import PLAYBACK_END_CHECK_INTERVAL
+from utils import log_message
+
+IDLE = "idle"
+LOADING = "loading"
+PLAYING = "playing"
+STOPPING = "stopping"
+
+
+class PlaybackController:
+    """
+    State machine for one channel: idle -> loading -> playing -> (stopping ->) idle.
+
+    play() and stop() only record the request and set an Event, so they
+    return at once on any thread; the controller thread acts on a stop
+    within a millisecond or so. While a sound plays the thread sleeps on
+    that Event with a timeout equal to the sound's remaining length, so
+    neither stopping nor completion is found by polling.
+
+    Args:
+        app: The application (song library, audio cache, bell metrics)
+        channel (int): Mixer channel; PRIORITY_CHANNEL plays over the zones and ducks them
+        kind (str): 'scheduled' or 'manual', recorded in the bell metrics
+    """
+
+    def __init__(self, app, channel=0, kind='scheduled'):
+        self.app = app
+        self.channel = channel
+        self.kind = kind
+        self.state = IDLE
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._idle = threading.Event()
+        self._idle.set()
+        self._request = None         # (song_name, scheduled_at, on_finished, fired_at) not yet started
+        self._armed = None           # (scheduled_at, PreparedBell) loaded ahead by arm()
+        self._stop_requested = False
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def play(self, song_name=None, scheduled_at=None, on_finished=None, fired_at=None):
+        """
+        Play a bell, replacing whatever this channel is playing.
+        on_finished() is called on the controller thread once the bell has ended or was stopped.
+        fired_at is when the scheduler fired the bell, recorded in the bell metrics.
+        """
+        with self._lock:
+            dropped, self._request = self._request, (song_name, scheduled_at, on_finished, fired_at)
+            self._idle.clear()
+        self._wake.set()
+        self._finish_dropped(dropped)
+
+    def stop(self):
+        """Stop the current bell, if any. Never blocks."""
+        with self._lock:
+            dropped, self._request = self._request, None
+            if self.state != IDLE:
+                self._stop_requested = True
+            else:
+                # The thread had not picked the request up yet, so it would never report idle
+                self._idle.set()
+        self._wake.set()
+        self._finish_dropped(dropped)
+
+    @staticmethod
+    def _finish_dropped(request):
+        """A request replaced or stopped before it started still reports that it is over."""
+        if request and request[2]:
+            request[2]()
+
+    def arm(self, song_name, scheduled_at):
+        """
+        Resolve and decode the bell due at `scheduled_at` now, on the caller's thread, so that
+        play() for that bell only has to start the sound. Replaces any bell armed before.
+        """
+        bell = prepare_bell(self.app, song_name, self.channel)
+        with self._lock:
+            self._armed = (scheduled_at, bell) if bell else None
+        return bell
+
+    def disarm(self):
+        """Drop the armed bell; it will be loaded at its time as usual if it still rings."""
+        with self._lock:
+            self._armed = None
+
+    def is_busy(self):
+        """True from play() until the bell has ended or been stopped."""
+        return not self._idle.is_set()
+
+    def wait_idle(self, timeout=None):
+        return self._idle.wait(timeout)
+
+    def _run(self):
+        while True:
+            with self._lock:
+                request, self._request = self._request, None
+                self._stop_requested = False
+                if request is not None:
+                    self.state = LOADING  # Under the lock, so stop() from now on interrupts this bell
+            if request is None:
+                self._wake.wait()
+                self._wake.clear()
+                continue
+            song_name, scheduled_at, on_finished, fired_at = request
+            try:
+                self._play(song_name, scheduled_at, fired_at)
+            except Exception as e:
+                log_message(self.app, f"[ГРЕШКА] Проблем при възпроизвеждане: {e}")
+            with self._lock:
+                if self._request is None:
+                    # Idle before on_finished runs, so the callback sees is_busy() == False
+                    self.state = IDLE
+                    self._idle.set()
+            if on_finished:
+                on_finished()
+
+    def _play(self, song_name, scheduled_at, fired_at):
+        with self._lock:
+            armed, self._armed = self._armed, None
+        prepared = armed[1] if armed and armed[0] == scheduled_at else None
+        timing, length = start_bell(self.app, self.kind, song_name, scheduled_at, self.channel, prepared, fired_at)
+        if timing is not None:
+            self.state = PLAYING
+            if self._wait_for_end(length):
+                self.state = STOPPING
+                if self.channel == PRIORITY_CHANNEL:
+                    stop_priority()
+                else:
+                    stop_playback(self.channel)
+            self.app.bell_metrics.finish(timing)
+
+    def _wait_for_end(self, length):
+        """Sleep until the sound ends or a stop/new bell is requested. Returns True if interrupted."""
+        deadline = time.monotonic() + length if length else None
+        while True:
+            timeout = max(0.0, deadline - time.monotonic()) if deadline else PLAYBACK_END_CHECK_INTERVAL
+            if self._wake.wait(timeout):
+                self._wake.clear()
+                with self._lock:
+                    if self._stop_requested or self._request is not None:
+                        return True
+                continue
+            if not is_playing(self.channel):
+                return False
+            # Still audible past its expected end (device buffering), or streamed with no known length
+            deadline = None
@@ -0,0 +1,119 @@
+"""
+Playback worker for the School Bell application.
+Plays scheduled bells on its own thread so the scheduler never blocks on audio.
+"""
+import queue
+import threading
+import time
+from datetime import datetime
+from config import OVERLAP_PREEMPT, OVERLAP_QUEUE, OVERLAP_SKIP
+from utils import log_message
+
+
+QUEUE_WAIT_INTERVAL = 0.1  # seconds
+
+
+def _fmt(ts):
+    return datetime.fromtimestamp(ts).strftime("%H:%M:%S.%f")[:-3]
+
+
+class BellJob:
+    __slots__ = ("song_name", "scheduled_at", "submitted_at", "preroll")
+
+    def __init__(self, song_name, scheduled_at, submitted_at, preroll=False):
+        self.song_name = song_name
+        self.scheduled_at = scheduled_at
+        self.submitted_at = submitted_at
+        self.preroll = preroll  # Only arm the bell; it rings when the job for its time arrives
+
+
+class PlaybackWorker:
+    """
+    Consumes bell jobs from a queue and hands them to a zone's PlaybackController
+    according to an overlap policy.
+
+    Policies when a sound is already playing:
+        preempt - stop the current sound and play the new bell
+        queue   - wait for the current sound to end, then play
+        skip    - drop the new bell
+    """
+
+    def __init__(self, app, controller, policy=OVERLAP_PREEMPT):
+        if policy not in (OVERLAP_PREEMPT, OVERLAP_QUEUE, OVERLAP_SKIP):
+            raise ValueError(f"Unknown overlap policy: {policy}")
+        self.app = app
+        self.controller = controller
+        self.policy = policy
+        self.jobs = queue.Queue()
+        self._stop = threading.Event()
+        self.thread = None
+
+    def start(self):
+        self._stop.clear()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self.jobs.put(None)
+        self.controller.stop()  # Also releases a job waiting under the queue policy
+        if self.thread and self.thread is not threading.current_thread():
+            self.thread.join(timeout=1)
+        self.thread = None
+
+    def submit(self, song_name, scheduled_at):
+        """Hand a bell to the worker. Safe to call from any thread; never blocks."""
+        self.jobs.put(BellJob(song_name, scheduled_at, time.time()))
+
+    def arm(self, song_name, scheduled_at):
+        """Have the bell due at `scheduled_at` loaded ahead of time. Safe to call from any thread; never blocks."""
+        self.jobs.put(BellJob(song_name, scheduled_at, time.time(), preroll=True))
+
+    def _run(self):
+        while not self._stop.is_set():
+            job = self.jobs.get()
+            if job is None:
+                break
+            try:
+                if job.preroll:
+                    self._arm(job)
+                else:
+                    self._handle(job)
+            except Exception as e:
+                log_message(self.app, f"[ГРЕШКА] Проблем при обработка на звънец: {e}")
+
+    def _log_decision(self, job, decision):
+        now = time.time()
+        log_message(self.app, f"Звънец за {_fmt(job.scheduled_at)}: {decision} "
+                              f"(решение в {_fmt(now)}, закъснение {(now - job.scheduled_at) * 1000:.0f} ms)")
+
+    def _arm(self, job):
+        if self.app.quiet_mode_enabled:
+            return  # Nothing will be played
+        try:
+            bell = self.controller.arm(job.song_name, job.scheduled_at)
+        except Exception as e:
+            log_message(self.app, f"[ГРЕШКА] Звънецът за {_fmt(job.scheduled_at)} не може да бъде подготвен: {e}")
+            return
+        if bell:
+            self.app.prepare_notification()
+            log_message(self.app, f"Звънец за {_fmt(job.scheduled_at)}: подготвен '{bell.song}'")
+
+    def _handle(self, job):
+        if self.controller.is_busy():
+            if self.policy == OVERLAP_SKIP:
+                self._log_decision(job, "пропуснат, защото друг звук още свири")
+                return
+            if self.policy == OVERLAP_QUEUE:
+                self._log_decision(job, "изчаква текущия звук")
+                # Short waits so stop() is noticed even if the controller never goes idle
+                while not self.controller.wait_idle(QUEUE_WAIT_INTERVAL):
+                    if self._stop.is_set():
+                        return
+                if self._stop.is_set():
+                    return
+            else:
+                # The controller stops the current sound itself when given the new bell
+                self._log_decision(job, "прекъсва текущия звук")
+        self._log_decision(job, "пуснат")
+        self.controller.play(job.song_name, job.scheduled_at, fired_at=job.submitted_at)
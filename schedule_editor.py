@@ -2,10 +2,12 @@
 Schedule editor window for the School Bell application.
 """
 import customtkinter
-import os
-from config import DAYS_OF_WEEK, BG_WEEKDAYS
-from utils import save_schedule
-import csv
+from bisect import bisect_right
+from config import DAYS_OF_WEEK, RED
+from schedule_model import BellEntry, Schedule, parse_time
+from virtual_list import VirtualList
+
+EDITOR_ROW_HEIGHT = 44
 
 
 class ScheduleEditorWindow(customtkinter.CTkToplevel):
@@ -56,8 +58,10 @@ class ScheduleEditorWindow(customtkinter.CTkToplevel):
         cancel_button = customtkinter.CTkButton(buttons_frame, text="Отказ", fg_color="#E84545", hover_color="#c53232", command=self.cancel)
         cancel_button.grid(row=0, column=1, padx=5, pady=5, sticky="ew")
 
-        # Initialize temp_schedule with a copy of the parent's schedule
-        self.temp_schedule = [dict(entry) for entry in self.parent_app.bell_times]
+        # Editable per-day copies of the parent's schedule, each kept sorted by time
+        self.temp_days = self.parent_app.schedule.days()
+        self.selected_entries = set()
+        self.editing_entry = None
 
         # Populate the editor
         self.populate_editor()
@@ -107,8 +111,7 @@ class ScheduleEditorWindow(customtkinter.CTkToplevel):
 
         customtkinter.CTkLabel(bulk_edit_frame, text="Масово редактиране на селектирани записи:").grid(row=0, column=0, padx=(0, 5), sticky="w")
 
-        from config import RESOURCES_DIR
-        bulk_song_list = ["Случайна"] + [s for s in os.listdir(RESOURCES_DIR) if s.endswith((".mp3", ".wav", ".ogg"))]
+        bulk_song_list = ["Случайна"] + self.parent_app.song_library.names()
         self.bulk_song_var = customtkinter.StringVar(value=bulk_song_list[0])
         bulk_song_option = customtkinter.CTkOptionMenu(bulk_edit_frame, variable=self.bulk_song_var, values=bulk_song_list, width=140)
         bulk_song_option.grid(row=0, column=1, sticky="w", padx=(0, 10))
@@ -118,10 +121,10 @@ class ScheduleEditorWindow(customtkinter.CTkToplevel):
                                                  fg_color="#8B4513", hover_color="#A0522D", command=self.bulk_edit_selected_songs)
         bulk_edit_button.grid(row=0, column=2, padx=(5,0))
 
-        # Scrollable frame for schedule entries
-        self.editor_frame = customtkinter.CTkScrollableFrame(edit_container, label_text="Програма за избрания ден", height=300)
-        self.editor_frame.grid(row=2, column=0, sticky="nsew", padx=5, pady=5)
-        self.editor_frame.grid_columnconfigure(0, weight=1)
+        # Virtualized list for schedule entries: only the visible rows have widgets
+        self.editor_list = VirtualList(edit_container, row_height=EDITOR_ROW_HEIGHT, make_row=self.make_editor_row,
+                                       bind_row=self.bind_editor_row, label_text="Програма за избрания ден", height=300)
+        self.editor_list.grid(row=2, column=0, sticky="nsew", padx=5, pady=5)
 
         # Add entry frame
         add_frame = customtkinter.CTkFrame(edit_container)
@@ -136,8 +139,7 @@ class ScheduleEditorWindow(customtkinter.CTkToplevel):
         self.time_entry = customtkinter.CTkEntry(add_frame, placeholder_text="HH:MM", width=100)
         self.time_entry.grid(row=0, column=1, sticky="w", padx=(0, 10))
 
-        from config import RESOURCES_DIR
-        self.song_list = ["Случайна"] + [s for s in os.listdir(RESOURCES_DIR) if s.endswith((".mp3", ".wav", ".ogg"))]
+        self.song_list = ["Случайна"] + self.parent_app.song_library.names()
         self.song_var = customtkinter.StringVar(value=self.song_list[0])
         song_option = customtkinter.CTkOptionMenu(add_frame, variable=self.song_var, values=self.song_list, width=140)
         song_option.grid(row=0, column=3, sticky="w", padx=(0, 10))
@@ -274,8 +276,7 @@ class ScheduleEditorWindow(customtkinter.CTkToplevel):
 
         customtkinter.CTkLabel(song_selection_frame, text="Нова песен:").grid(row=0, column=0, sticky="w", padx=(0, 5))
 
-        from config import RESOURCES_DIR
-        self.bulk_edit_song_list = ["Случайна"] + [s for s in os.listdir(RESOURCES_DIR) if s.endswith((".mp3", ".wav", ".ogg"))]
+        self.bulk_edit_song_list = ["Случайна"] + self.parent_app.song_library.names()
         self.bulk_edit_song_var = customtkinter.StringVar(value=self.bulk_edit_song_list[0])
         song_option = customtkinter.CTkOptionMenu(song_selection_frame, variable=self.bulk_edit_song_var, values=self.bulk_edit_song_list, width=140)
         song_option.grid(row=0, column=1, sticky="w", padx=(0, 10))
@@ -300,199 +301,177 @@ class ScheduleEditorWindow(customtkinter.CTkToplevel):
 
         # Process each selected day
         for day in selected_days:
-            # Get all entries for this day
-            day_entries = [entry for entry in self.temp_schedule if entry['day'] == day]
-
-            # Update the song for each entry
-            for entry in day_entries:
+            # Update the song for each entry of this day
+            for entry in self.temp_days[DAYS_OF_WEEK.index(day)]:
                 if new_song == "Случайна":
-                    entry['song'] = None  # Will trigger random song
+                    entry.song = None  # Will trigger random song
                 else:
-                    entry['song'] = new_song
+                    entry.song = new_song
 
-        # Refresh the display
-        self.populate_editor()
-        # If currently viewing one of the modified days, update the display
+        # If currently viewing one of the modified days, refresh its visible rows
         if self.selected_day_var.get() in selected_days:
-            self.populate_editor()
-
-    def bulk_copy_schedule(self):
-        source_day = self.bulk_source_day_var.get()
-        target_days = [var.get() for var in self.bulk_target_day_vars.values() if var.get()]
-
-        if not target_days:
-            return
-
-        source_schedule = [entry for entry in self.parent_app.bell_times if entry['day'] == source_day]
-
-        # Remove existing entries for target days from temp_schedule
-        filtered_temp = [entry for entry in self.temp_schedule if entry['day'] not in target_days]
-
-        # Add copied entries
-        for day in target_days:
-            for source_entry in source_schedule:
-                new_entry = source_entry.copy()
-                new_entry['day'] = day
-                filtered_temp.append(new_entry)
+            self.editor_list.refresh()
+
+    def selected_day_index(self):
+        return DAYS_OF_WEEK.index(self.selected_day_var.get())
+
+    def populate_editor(self, scroll_to_top=False):
+        # Entries for the selected day, already sorted by time; only visible rows are (re)bound
+        self.editor_list.set_items(self.temp_days[self.selected_day_index()], scroll_to_top=scroll_to_top)
+
+    def make_editor_row(self, parent):
+        """Build one pooled row; it is re-bound to different entries as the list scrolls."""
+        row = customtkinter.CTkFrame(parent)
+        row.grid_columnconfigure(0, weight=1)
+        row.entry = None
+
+        # Create a sub-frame for the content to better align elements
+        content_frame = customtkinter.CTkFrame(row, fg_color="transparent")
+        content_frame.grid(row=0, column=0, sticky="ew", padx=10, pady=5)
+        content_frame.grid_columnconfigure(1, weight=1)
+
+        # Add checkbox for bulk selection
+        row.checkbox_var = customtkinter.BooleanVar()
+        checkbox = customtkinter.CTkCheckBox(content_frame, text="", variable=row.checkbox_var, width=20,
+                                             command=lambda: self.toggle_selected(row))
+        checkbox.grid(row=0, column=0, sticky="w", padx=(0, 5))
+
+        row.label = customtkinter.CTkLabel(content_frame, text="", anchor="w")
+        row.label.grid(row=0, column=1, sticky="ew", padx=(0, 10))
+
+        # Inline editing controls, shown instead of the label while the row's entry is being edited
+        row.edit_frame = customtkinter.CTkFrame(content_frame, fg_color="transparent")
+        row.edit_frame.grid(row=0, column=1, sticky="ew", padx=(0, 10))
+        row.inline_time_entry = customtkinter.CTkEntry(row.edit_frame, width=80)
+        row.inline_time_entry.grid(row=0, column=0, sticky="w", padx=(0, 5))
+        row.inline_song_var = customtkinter.StringVar()
+        row.inline_song_menu = customtkinter.CTkOptionMenu(row.edit_frame, variable=row.inline_song_var, values=self.song_list, width=120)
+        row.inline_song_menu.grid(row=0, column=1, sticky="w", padx=(0, 10))
+        row.edit_frame.grid_remove()
+
+        # Button frame for edit/delete buttons
+        button_frame = customtkinter.CTkFrame(content_frame, fg_color="transparent")
+        button_frame.grid(row=0, column=2, sticky="e")
 
-        self.temp_schedule = filtered_temp
-        self.populate_editor()
+        row.edit_button = customtkinter.CTkButton(button_frame, text="Промени", width=70, fg_color="#3a7ebf")
+        row.edit_button.grid(row=0, column=0, padx=2)
+        delete_button = customtkinter.CTkButton(button_frame, text="Изтрий", width=70, fg_color="#E84545",
+                                                command=lambda: self.delete_schedule_entry(row.entry))
+        delete_button.grid(row=0, column=1, padx=2)
+        return row
+
+    def bind_editor_row(self, row, entry):
+        """Show `entry` in a pooled row."""
+        row.entry = entry
+        row.checkbox_var.set(entry in self.selected_entries)
+        if entry is self.editing_entry:
+            row.label.grid_remove()
+            row.inline_time_entry.delete(0, 'end')
+            row.inline_time_entry.insert(0, entry.time)
+            row.inline_song_var.set(entry.song if entry.song else "Случайна")
+            row.edit_frame.grid()
+            row.edit_button.configure(text="Запази", fg_color="#2CC985", command=lambda: self.save_inline_edit(row.entry))
+        else:
+            song_display = entry.song if entry.song else "Случайна"
+            problem = self.parent_app.song_checker.problems.get(song_display)
+            if problem:
+                row.label.configure(text=f"{entry.time} ({song_display}) ⚠ {problem}", text_color=RED)
+            else:
+                row.label.configure(text=f"{entry.time} ({song_display})",
+                                    text_color=customtkinter.ThemeManager.theme["CTkLabel"]["text_color"])
+            row.edit_frame.grid_remove()
+            row.label.grid()
+            row.edit_button.configure(text="Промени", fg_color="#3a7ebf", command=lambda: self.toggle_inline_edit(row.entry))
+
+    def toggle_selected(self, row):
+        if row.checkbox_var.get():
+            self.selected_entries.add(row.entry)
+        else:
+            self.selected_entries.discard(row.entry)
 
-    def on_day_change(self, *args):
-        """Callback when the selected day changes"""
-        # Update the view to show entries for the selected day
-        self.populate_editor()
+    def toggle_inline_edit(self, entry):
+        previous = self.editing_entry
+        self.editing_entry = entry
+        self.editor_list.refresh({entry, previous})
 
-    def populate_editor(self):
-        for widget in self.editor_frame.winfo_children():
-            widget.destroy()
-
-        # Get the selected day
-        selected_day = self.selected_day_var.get()
-
-        # Filter entries for the selected day
-        day_entries = [entry for entry in self.temp_schedule if entry['day'] == selected_day]
-        day_entries.sort(key=lambda x: x['time'])  # Sort by time only since all entries are for the same day
-
-        self.entry_widgets = {}
-        for entry in day_entries:
-            entry_id = id(entry)
-            frame = customtkinter.CTkFrame(self.editor_frame)
-            frame.pack(fill="x", padx=5, pady=5)
-            frame.grid_columnconfigure(0, weight=1)
-
-            # Create a sub-frame for the content to better align elements
-            content_frame = customtkinter.CTkFrame(frame, fg_color="transparent")
-            content_frame.grid(row=0, column=0, sticky="ew", padx=10, pady=5)
-            content_frame.grid_columnconfigure(0, weight=1)
-
-            # Add checkbox for bulk selection
-            checkbox_var = customtkinter.BooleanVar()
-            checkbox = customtkinter.CTkCheckBox(content_frame, text="", variable=checkbox_var, width=20)
-            checkbox.grid(row=0, column=0, sticky="w", padx=(0, 5))
-
-            song_display = entry.get('song') if entry.get('song') else "Случайна"
-            label = customtkinter.CTkLabel(content_frame, text=f"{entry['time']} ({song_display})", anchor="w")
-            label.grid(row=0, column=1, sticky="ew", padx=(0, 10))
-
-            # Button frame for edit/delete buttons
-            button_frame = customtkinter.CTkFrame(content_frame, fg_color="transparent")
-            button_frame.grid(row=0, column=2, sticky="e")
-
-            edit_button = customtkinter.CTkButton(button_frame, text="Промени", width=70, fg_color="#3a7ebf", command=lambda e=entry, f=frame: self.toggle_inline_edit(e, f))
-            edit_button.grid(row=0, column=0, padx=2)
-            delete_button = customtkinter.CTkButton(button_frame, text="Изтрий", width=70, fg_color="#E84545", command=lambda e=entry, f=frame: self.delete_schedule_entry(e, f))
-            delete_button.grid(row=0, column=1, padx=2)
-
-            self.entry_widgets[entry_id] = {
-                'frame': frame,
-                'label': label,
-                'edit_button': edit_button,
-                'checkbox': checkbox,
-                'checkbox_var': checkbox_var,
-                'entry': entry
-            }
-
-    def toggle_inline_edit(self, entry, frame):
-        widgets = self.entry_widgets[id(entry)]
-
-        # Remove the original label
-        widgets['label'].grid_forget()
-
-        # Change the edit button to save button
-        widgets['edit_button'].configure(text="Запази", fg_color="#2CC985", command=lambda e=entry, f=frame: self.save_inline_edit(e, f))
-
-        # Get the content frame inside the main frame
-        content_frame = frame.winfo_children()[0]  # This should be the content_frame
-
-        # Create a temporary frame for editing controls
-        edit_frame = customtkinter.CTkFrame(content_frame, fg_color="transparent")
-        edit_frame.grid(row=0, column=0, sticky="ew", padx=10, pady=5)
-        edit_frame.grid_columnconfigure(0, weight=1)
-
-        # Create editing controls
-        inline_time_entry = customtkinter.CTkEntry(edit_frame, width=80)
-        inline_time_entry.insert(0, entry['time'])
-        inline_time_entry.grid(row=0, column=0, sticky="w", padx=(0, 5))
-
-        current_song = entry.get('song') if entry.get('song') else "Случайна"
-        inline_song_var = customtkinter.StringVar(value=current_song)
-        from config import RESOURCES_DIR
-        song_list = ["Случайна"] + [s for s in os.listdir(RESOURCES_DIR) if s.endswith((".mp3", ".wav", ".ogg"))]
-        inline_song_menu = customtkinter.CTkOptionMenu(edit_frame, variable=inline_song_var, values=song_list, width=120)
-        inline_song_menu.grid(row=0, column=1, sticky="w", padx=(0, 10))
-
-        # Button frame for the save button
-        button_frame = customtkinter.CTkFrame(edit_frame, fg_color="transparent")
-        button_frame.grid(row=0, column=2, sticky="e")
+    def save_inline_edit(self, entry):
+        row = self.editor_list.row_for(entry)
+        if row is None:
+            return
+        new_time = row.inline_time_entry.get()
+        new_song = row.inline_song_var.get()
 
-        # Store references to the editing widgets
-        widgets['edit_frame'] = edit_frame
-        widgets['inline_time_entry'] = inline_time_entry
-        widgets['inline_song_var'] = inline_song_var
-        widgets['inline_song_menu'] = inline_song_menu
-
-    def save_inline_edit(self, entry, frame):
-        widgets = self.entry_widgets[id(entry)]
-        new_time = widgets['inline_time_entry'].get()
-        new_song = widgets['inline_song_var'].get()
-
-        if len(new_time.split(':')) == 2 and all(c.isdigit() for c in "".join(new_time.split(':'))):
-            entry['time'] = new_time
-            entry['song'] = new_song if new_song != "Случайна" else None
-            # Clean up the editing widgets
-            widgets['edit_frame'].destroy()
-            self.populate_editor()
-        else:
+        try:
+            minute = parse_time(new_time)
+        except ValueError:
             print("Invalid time format for inline edit")
+            return
+        self.editing_entry = None
+        entry.song = new_song if new_song != "Случайна" else None
+        if minute == entry.minute:
+            self.editor_list.refresh({entry})
+            return
+        entry.minute = minute
+        self.temp_days[entry.day].sort(key=lambda e: e.minute)
+        # The order changed: rows now showing a different entry are re-bound, plus the edited one
+        self.populate_editor()
+        self.editor_list.refresh({entry})
 
     def toggle_select_all(self):
         """Toggle selection of all entries"""
-        select_all = self.select_all_var.get()
-        for entry_id, widgets in self.entry_widgets.items():
-            widgets['checkbox_var'].set(select_all)
+        if self.select_all_var.get():
+            self.selected_entries = set(self.temp_days[self.selected_day_index()])
+        else:
+            self.selected_entries = set()
+        for row in self.editor_list.rows:
+            if row.entry is not None:
+                row.checkbox_var.set(row.entry in self.selected_entries)
 
     def bulk_edit_selected_songs(self):
         """Bulk edit songs for selected entries"""
-        selected_entries = []
-        for entry_id, widgets in self.entry_widgets.items():
-            if widgets['checkbox_var'].get():
-                selected_entries.append(widgets['entry'])
-
+        selected_entries = self.selected_entries
         if not selected_entries:
             return
 
         new_song = self.bulk_song_var.get()
         for entry in selected_entries:
             if new_song == "Случайна":
-                entry['song'] = None  # Will trigger random song
+                entry.song = None  # Will trigger random song
             else:
-                entry['song'] = new_song
+                entry.song = new_song
 
-        # Refresh the display
-        self.populate_editor()
+        # Refresh only the rows showing edited entries
+        self.editor_list.refresh(selected_entries)
 
     def on_day_change(self, *args):
         """Callback when the selected day changes"""
-        # Reset the select all checkbox when changing days
+        # Reset the selection and the select all checkbox when changing days
         self.select_all_var.set(False)
+        self.selected_entries = set()
+        self.editing_entry = None
         # Update the view to show entries for the selected day
-        self.populate_editor()
+        self.populate_editor(scroll_to_top=True)
 
     def add_schedule_entry(self):
-        day = self.selected_day_var.get()  # Use the selected day from the dropdown
-        new_time = self.time_entry.get()
+        day = self.selected_day_index()  # Use the selected day from the dropdown
         song = self.song_var.get()
-        if len(new_time.split(':')) == 2 and all(c.isdigit() for c in "".join(new_time.split(':'))):
-            self.temp_schedule.append({'day': day, 'time': new_time, 'song': song if song != "Случайна" else None})
-            self.time_entry.delete(0, 'end')
-            self.populate_editor()
-        else:
+        try:
+            minute = parse_time(self.time_entry.get())
+        except ValueError:
             print("Invalid time format for new entry")
+            return
+        day_entries = self.temp_days[day]
+        position = bisect_right([e.minute for e in day_entries], minute)
+        day_entries.insert(position, BellEntry(day, minute, song if song != "Случайна" else None))
+        self.time_entry.delete(0, 'end')
+        self.populate_editor()
 
-    def delete_schedule_entry(self, entry, frame):
-        self.temp_schedule.remove(entry)
-        frame.destroy()
+    def delete_schedule_entry(self, entry):
+        self.temp_days[entry.day].remove(entry)
+        self.selected_entries.discard(entry)
+        if entry is self.editing_entry:
+            self.editing_entry = None
+        self.populate_editor()
 
     def bulk_copy_schedule(self):
         source_day = self.bulk_source_day_var.get()
@@ -501,23 +480,17 @@ class ScheduleEditorWindow(customtkinter.CTkToplevel):
         if not target_days:
             return
 
-        source_schedule = [entry for entry in self.parent_app.bell_times if entry['day'] == source_day]
-
-        # Remove existing entries for target days from temp_schedule
-        filtered_temp = [entry for entry in self.temp_schedule if entry['day'] not in target_days]
+        source_schedule = self.parent_app.schedule.day(DAYS_OF_WEEK.index(source_day))
 
-        # Add copied entries
+        # Replace the entries of each target day with copies of the source day
         for day in target_days:
-            for source_entry in source_schedule:
-                new_entry = source_entry.copy()
-                new_entry['day'] = day
-                filtered_temp.append(new_entry)
+            day_index = DAYS_OF_WEEK.index(day)
+            self.temp_days[day_index] = [entry.copy(day=day_index, line=None) for entry in source_schedule]
 
-        self.temp_schedule = filtered_temp
         self.populate_editor()
 
     def save_and_close(self):
-        self.parent_app.update_schedule(self.temp_schedule)
+        self.parent_app.update_schedule(Schedule(entry for day_entries in self.temp_days for entry in day_entries))
         self.destroy()
 
     def cancel(self):
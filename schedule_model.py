@@ -0,0 +1,198 @@
+"""
+Compiled schedule model for the School Bell application.
+Parses, validates and indexes the bell schedule once, at load or edit time.
+"""
+from bisect import bisect_left, bisect_right
+from datetime import datetime, time, timedelta
+from config import BG_WEEKDAYS
+
+MINUTES_PER_DAY = 24 * 60
+MINUTES_PER_WEEK = 7 * MINUTES_PER_DAY
+
+
+def parse_time(text):
+    """Parse an 'HH:MM' string into minutes since midnight. Raises ValueError."""
+    hours, minutes = text.strip().split(':')
+    if not (hours.isdigit() and minutes.isdigit()):
+        raise ValueError(f"невалиден час '{text}'")
+    hours, minutes = int(hours), int(minutes)
+    if not (0 <= hours < 24 and 0 <= minutes < 60):
+        raise ValueError(f"невалиден час '{text}'")
+    return hours * 60 + minutes
+
+
+def minute_of_week(moment):
+    """Return the minute-of-week offset (Monday 00:00 = 0) of a datetime."""
+    return moment.weekday() * MINUTES_PER_DAY + moment.hour * 60 + moment.minute
+
+
+def occurrence_after(offset, after):
+    """Return the first datetime strictly after `after` that falls on the given offset."""
+    week_start = after.date() - timedelta(days=after.weekday())
+    day, minute = divmod(offset, MINUTES_PER_DAY)
+    candidate = datetime.combine(week_start + timedelta(days=day), time(minute // 60, minute % 60))
+    if candidate <= after:
+        candidate = datetime.combine(week_start + timedelta(days=day + 7), candidate.time())
+    return candidate
+
+
+def local_timestamp(moment):
+    """
+    POSIX timestamp of a naive local time. A time skipped when the clocks go
+    forward for summer time (03:30 on the last Sunday of March in Europe/Sofia)
+    does not exist; it maps to the instant of the change, so such a bell rings
+    as the clock jumps to 04:00 rather than an hour late. A time that occurs
+    twice when the clocks go back rings at its first occurrence only.
+    """
+    timestamp = moment.timestamp()
+    if datetime.fromtimestamp(timestamp) == moment:
+        return timestamp
+    # In the gap: fold=1 reads the time with the summer offset, which lands before the change
+    low, high = int(moment.replace(fold=1).timestamp()), int(timestamp)
+    while high - low > 1:
+        middle = (low + high) // 2
+        if datetime.fromtimestamp(middle) > moment:
+            high = middle
+        else:
+            low = middle
+    return float(high)
+
+
+class BellEntry:
+    """One bell: weekday index (0 = Monday), minute of day and song file (None = random)."""
+    __slots__ = ("day", "minute", "song", "line")
+
+    def __init__(self, day, minute, song=None, line=None):
+        self.day = day
+        self.minute = minute
+        self.song = song
+        self.line = line
+
+    @property
+    def offset(self):
+        return self.day * MINUTES_PER_DAY + self.minute
+
+    @property
+    def day_name(self):
+        return BG_WEEKDAYS[self.day]
+
+    @property
+    def time(self):
+        return f"{self.minute // 60:02d}:{self.minute % 60:02d}"
+
+    def copy(self, **changes):
+        entry = BellEntry(self.day, self.minute, self.song, self.line)
+        for name, value in changes.items():
+            setattr(entry, name, value)
+        return entry
+
+    def __repr__(self):
+        return f"BellEntry({self.day_name} {self.time} {self.song!r})"
+
+
+class ScheduleError:
+    """A problem found while compiling the schedule, with its CSV line number if known."""
+    __slots__ = ("line", "message")
+
+    def __init__(self, line, message):
+        self.line = line
+        self.message = message
+
+    def __str__(self):
+        return f"ред {self.line}: {self.message}" if self.line else self.message
+
+
+def _seen_at(entry):
+    return f" (ред {entry.line})" if entry.line else ""
+
+
+class Schedule:
+    """
+    Validated, de-duplicated bell schedule sorted by minute-of-week.
+
+    Backs every consumer: the bell engine, the next-bell label, the today
+    panel and the editor all read the same compiled entries.
+    """
+
+    def __init__(self, entries=(), errors=()):
+        self.errors = list(errors)
+        self.entries = []
+        seen = {}
+        for entry in sorted(entries, key=lambda e: e.offset):
+            previous = seen.get(entry.offset)
+            if previous is None:
+                seen[entry.offset] = entry
+                self.entries.append(entry)
+            elif previous.song == entry.song:
+                self.errors.append(ScheduleError(entry.line, f"повтарящ се звънец {entry.day_name} {entry.time}{_seen_at(previous)}"))
+            else:
+                self.errors.append(ScheduleError(entry.line, f"конфликт: {entry.day_name} {entry.time} вече е с песен "
+                                                             f"'{previous.song or 'Случайна'}'{_seen_at(previous)}, записът е пропуснат"))
+
+        self.errors.sort(key=lambda error: error.line or 0)
+        self._build_index()
+
+    def _build_index(self):
+        self.offsets = [entry.offset for entry in self.entries]
+        # _day_starts[d]:_day_starts[d + 1] is the slice of bells on weekday d
+        self._day_starts = [bisect_left(self.offsets, d * MINUTES_PER_DAY) for d in range(8)]
+
+    def to_compiled(self):
+        """Plain, JSON-friendly form of the already validated schedule."""
+        return {
+            'entries': [(e.day, e.minute, e.song, e.line) for e in self.entries],
+            'errors': [(error.line, error.message) for error in self.errors],
+        }
+
+    @classmethod
+    def from_compiled(cls, data):
+        """Rebuild a schedule from to_compiled() output without validating it again."""
+        schedule = cls.__new__(cls)
+        schedule.entries = [BellEntry(*fields) for fields in data['entries']]
+        schedule.errors = [ScheduleError(*fields) for fields in data['errors']]
+        schedule._build_index()
+        return schedule
+
+    def __len__(self):
+        return len(self.entries)
+
+    def day(self, day_index):
+        """Return the entries for one weekday (0 = Monday), sorted by time."""
+        return self.entries[self._day_starts[day_index]:self._day_starts[day_index + 1]]
+
+    def days(self):
+        """Return editable per-day copies of the entries: a list of 7 sorted lists."""
+        return [[entry.copy(line=None) for entry in self.day(d)] for d in range(7)]
+
+    def next_after(self, moment):
+        """Return the first entry after the current minute, wrapping to next week, or None."""
+        if not self.offsets:
+            return None
+        i = bisect_right(self.offsets, minute_of_week(moment))
+        return self.entries[i % len(self.entries)]
+
+    def to_rows(self):
+        """Return the entries as CSV rows."""
+        return [{'Ден': e.day_name, 'Час': e.time, 'Песен': e.song} for e in self.entries]
+
+
+def compile_rows(rows):
+    """
+    Build a Schedule from raw CSV rows.
+
+    Args:
+        rows: iterable of (line_number, day_name, time_text, song) tuples
+    """
+    entries = []
+    errors = []
+    for line, day_name, time_text, song in rows:
+        if day_name not in BG_WEEKDAYS:
+            errors.append(ScheduleError(line, f"непознат ден '{day_name}'"))
+            continue
+        try:
+            minute = parse_time(time_text or "")
+        except ValueError:
+            errors.append(ScheduleError(line, f"невалиден час '{time_text}'"))
+            continue
+        entries.append(BellEntry(BG_WEEKDAYS.index(day_name), minute, song or None, line))
+    return Schedule(entries, errors)
@@ -0,0 +1,163 @@
+"""
+Schedule file watcher for the School Bell application.
+Detects external edits of the schedule CSV off the GUI thread and queues validated reloads.
+"""
+import ctypes
+import ctypes.util
+import os
+import queue
+import select
+import struct
+import threading
+import time
+from config import SCHEDULE_FILE, SCHEDULE_WATCH_DEBOUNCE, SCHEDULE_WATCH_POLL_INTERVAL
+from utils import read_schedule, save_schedule
+
+# inotify(7) constants
+IN_MODIFY = 0x002
+IN_CLOSE_WRITE = 0x008
+IN_MOVED_TO = 0x080
+IN_CREATE = 0x100
+IN_DELETE = 0x200
+_EVENT_HEADER = struct.Struct("iIII")
+
+
+class _InotifyBackend:
+    """Waits for changes using Linux inotify on the file's directory, so atomic renames are seen too."""
+
+    def __init__(self, path):
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self.name = os.path.basename(path).encode()
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1")
+        directory = os.path.dirname(os.path.abspath(path)).encode()
+        mask = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE | IN_DELETE
+        if libc.inotify_add_watch(self.fd, directory, mask) < 0:
+            os.close(self.fd)
+            raise OSError(ctypes.get_errno(), "inotify_add_watch")
+
+    def wait(self, timeout):
+        """
+        Block up to `timeout` seconds. Returns True as soon as the watched file is touched,
+        False only once the whole timeout passed without that; events for other files
+        in the directory (backups, cache sidecars, editor swap files) do not end the wait.
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            readable, _, _ = select.select([self.fd], [], [], remaining)
+            if not readable:
+                return False
+            try:
+                data = os.read(self.fd, 64 * 1024)
+            except BlockingIOError:
+                continue
+            offset = 0
+            touched = False
+            while offset + _EVENT_HEADER.size <= len(data):
+                _, _, _, length = _EVENT_HEADER.unpack_from(data, offset)
+                offset += _EVENT_HEADER.size
+                if data[offset:offset + length].rstrip(b"\0") == self.name:
+                    touched = True
+                offset += length
+            if touched:
+                return True
+
+    def close(self):
+        os.close(self.fd)
+
+
+class _PollingBackend:
+    """Portable fallback: compares the file's mtime and size at a fixed interval."""
+
+    def __init__(self, path):
+        self.path = path
+        self.signature = _signature(path)
+
+    def wait(self, timeout):
+        time.sleep(min(timeout, SCHEDULE_WATCH_POLL_INTERVAL))
+        signature = _signature(self.path)
+        if signature != self.signature:
+            self.signature = signature
+            return True
+        return False
+
+    def close(self):
+        pass
+
+
+def _signature(path):
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+class ScheduleWatcher:
+    """
+    Background watcher for the schedule CSV.
+
+    Bursts of writes are debounced, and a new version is only delivered once
+    it parses; a half-written file is ignored until the writer finishes.
+    Compiled schedules are put on `reloads` for the GUI thread to pick up.
+    """
+
+    def __init__(self, app, path=SCHEDULE_FILE):
+        self.app = app
+        self.path = path
+        self.reloads = queue.Queue()
+        self._signature = _signature(path)
+        self._lock = threading.Lock()  # Held while the app saves, so its own write is never taken for an edit
+        self._stop = threading.Event()
+        self.thread = None
+
+    def start(self):
+        try:
+            self._backend = _InotifyBackend(self.path)
+        except (OSError, AttributeError, TypeError):
+            self._backend = _PollingBackend(self.path)
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def save(self, schedule):
+        """Save a schedule to the watched file and remember its new state, so the app's own write is not reloaded."""
+        with self._lock:
+            save_schedule(schedule, self.path)
+            self._signature = _signature(self.path)
+
+    def _run(self):
+        try:
+            while not self._stop.is_set():
+                if not self._backend.wait(SCHEDULE_WATCH_POLL_INTERVAL):
+                    continue
+                # Debounce: wait until the file has been quiet for a while
+                while not self._stop.is_set() and self._backend.wait(SCHEDULE_WATCH_DEBOUNCE):
+                    pass
+                self._check()
+        finally:
+            self._backend.close()
+
+    def _check(self):
+        with self._lock:
+            self._check_locked()
+
+    def _check_locked(self):
+        signature = _signature(self.path)
+        if signature is None or signature == self._signature:
+            return
+        try:
+            schedule = read_schedule(self.path)
+        except Exception as e:
+            self.app.log_message(f"[ГРЕШКА] {os.path.basename(self.path)} е променен, но не може да бъде прочетен: {e}")
+            return
+        if _signature(self.path) != signature:
+            return  # Written again while parsing; the next event will pick it up
+        self._signature = signature
+        self.reloads.put(schedule)
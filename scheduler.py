@@ -1,32 +1,212 @@
 """
 Scheduler functions for the School Bell application.
 """
-import schedule
-import time
+import heapq
+import itertools
 import threading
-from datetime import timedelta
-from config import DAY_MAP_BG_TO_EN
+from datetime import datetime
+from clock import SystemClock
+from config import SCHEDULER_MAX_WAIT, SCHEDULER_SPIN_WINDOW, MISSED_BELL_GRACE, BELL_PREROLL
+from playback_worker import PlaybackWorker
+from schedule_model import local_timestamp, occurrence_after
 from utils import log_message
+from zones import disarm_zones, stop_all_playback, zone_next_bells
+
+
+class BellEngine:
+    """
+    Event-driven bell engine.
+
+    Keeps a heap of upcoming fire times and sleeps on a threading.Event until
+    the earliest one is due, so the thread only wakes up for bells, reloads
+    and stop requests instead of once per second.
+
+    `on_fire(entry, fire_ts, zone)` is the audio sink and `clock` the time
+    source (SystemClock by default); both can be replaced to replay a
+    schedule in simulated time. Each bell is tagged with the zone whose
+    schedule it came from, so one engine drives every zone.
+
+    With `on_preroll`, the same call is also made `preroll` seconds before
+    each bell (or at once, for a bell already that close), so the sink can
+    get the sound ready. A second heap holds the bells not yet pre-rolled.
+    """
+
+    def __init__(self, app, on_fire, clock=None, on_preroll=None, preroll=0):
+        self.app = app
+        self.on_fire = on_fire
+        self.on_preroll = on_preroll
+        self.preroll = preroll if on_preroll else 0
+        self.clock = clock or SystemClock()
+        self._heap = []
+        self._preroll_heap = []  # Same items as _heap, removed once pre-rolled
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._counter = itertools.count()
+        self._running = False
+        self.thread = None
+
+    def load(self, schedule, zone=None):
+        """Replace the pending bells of `zone` with the entries of a compiled Schedule."""
+        now = self.clock.now()
+        added = [(local_timestamp(occurrence_after(entry.offset, now)), next(self._counter), entry, zone)
+                 for entry in schedule.entries]
+        with self._lock:
+            heap = [item for item in self._heap if item[3] is not zone] + added
+            heapq.heapify(heap)
+            self._heap = heap
+            self._set_prerolls(zone, added)
+        self._wakeup.set()
+
+    def apply(self, schedule, zone=None):
+        """
+        Switch `zone` to a new schedule without restarting. Other zones are not touched.
+
+        Only bells that were added or removed are touched; unchanged bells keep
+        their pending fire time. The new heap is built aside and swapped in under
+        the lock, so there is never a moment with no bells registered.
+        Returns (added, removed) counts.
+        """
+        wanted = {(entry.offset, entry.song): entry for entry in schedule.entries}
+        now = self.clock.now()
+        with self._lock:
+            others = [item for item in self._heap if item[3] is not zone]
+            kept = [item for item in self._heap if item[3] is zone and (item[2].offset, item[2].song) in wanted]
+            present = {(item[2].offset, item[2].song) for item in kept}
+            added = [(local_timestamp(occurrence_after(entry.offset, now)), next(self._counter), entry, zone)
+                     for key, entry in wanted.items() if key not in present]
+            removed = len(self._heap) - len(others) - len(kept)
+            heap = others + kept + added
+            heapq.heapify(heap)
+            self._heap = heap
+            # Kept bells are pre-rolled again too: the caller drops what it armed for the old schedule
+            self._set_prerolls(zone, kept + added)
+        self._wakeup.set()
+        return len(added), removed
+
+    def _set_prerolls(self, zone, items):
+        """Replace the pending pre-rolls of `zone`. Call with the lock held."""
+        if self.preroll:
+            heap = [item for item in self._preroll_heap if item[3] is not zone] + items
+            heapq.heapify(heap)
+            self._preroll_heap = heap
+
+    def _run_prerolls(self):
+        """Pre-roll every bell due within `preroll` seconds. Returns seconds until the next pre-roll, or None."""
+        now = self.clock.time()
+        due = []
+        with self._lock:
+            while self._preroll_heap and self._preroll_heap[0][0] - self.preroll <= now:
+                due.append(heapq.heappop(self._preroll_heap))
+            next_in = self._preroll_heap[0][0] - self.preroll - now if self._preroll_heap else None
+        for fire_ts, _, entry, zone in due:
+            if fire_ts > now:
+                self.on_preroll(entry, fire_ts, zone)
+        return next_in
+
+    def start(self):
+        self._running = True
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self._running = False
+        self._wakeup.set()
+        if self.thread and self.thread is not threading.current_thread():
+            self.thread.join(timeout=1)
+        self.thread = None
+
+    def _pop_due(self, head):
+        """Remove `head` from the heap and queue the entry's next occurrence."""
+        with self._lock:
+            if not self._heap or self._heap[0] is not head:
+                return False  # Schedule was reloaded while we were waiting
+            fire_ts, _, entry, zone = heapq.heappop(self._heap)
+            next_fire = occurrence_after(entry.offset, datetime.fromtimestamp(fire_ts))
+            item = (local_timestamp(next_fire), next(self._counter), entry, zone)
+            heapq.heappush(self._heap, item)
+            if self.preroll:
+                heapq.heappush(self._preroll_heap, item)
+        return True
+
+    def _run(self):
+        while self._running:
+            preroll_in = self._run_prerolls() if self.preroll else None
+            with self._lock:
+                head = self._heap[0] if self._heap else None
+
+            if head is None:
+                self.clock.wait(self._wakeup, SCHEDULER_MAX_WAIT)
+                self._wakeup.clear()
+                continue
 
+            remaining = head[0] - self.clock.time()
+            if remaining > SCHEDULER_SPIN_WINDOW:
+                # Coarse sleep; capped so wall-clock jumps (NTP, suspend) are noticed
+                timeout = min(remaining - SCHEDULER_SPIN_WINDOW, SCHEDULER_MAX_WAIT)
+                if preroll_in is not None:
+                    timeout = max(0.0, min(timeout, preroll_in))
+                self.clock.wait(self._wakeup, timeout)
+                self._wakeup.clear()
+                continue
 
-def start_service(app):
-    """Start the bell scheduling service."""
+            # Fine-grained tail so the bell fires within a few milliseconds of its target
+            while self._running and not self._wakeup.is_set() and self.clock.time() < head[0]:
+                self.clock.sleep(0.001)
+            if not self._running or self._wakeup.is_set():
+                continue
+
+            if not self._pop_due(head):
+                continue
+            fire_ts, _, entry, zone = head
+            lateness = self.clock.time() - fire_ts
+            if lateness > MISSED_BELL_GRACE:
+                log_message(self.app, f"[ГРЕШКА] Пропуснат звънец: {entry.day_name} в {entry.time} (закъснение {lateness:.0f} сек.)")
+                continue
+            self.on_fire(entry, fire_ts, zone)
+
+
+def start_engine(app):
+    """Start a playback worker per zone and one bell engine for every zone's schedule. Touches no widgets."""
     app.service_running = True
     log_message(app, "Услугата стартира...")
+    log_message(app, "Планиране на задачите...")
+    for zone in app.zones:
+        zone.playback_worker = PlaybackWorker(app, zone.playback, zone.policy)
+        zone.playback_worker.start()
+    app.bell_engine = BellEngine(app, lambda entry, fire_ts, zone: zone.playback_worker.submit(entry.song, fire_ts),
+                                 on_preroll=lambda entry, fire_ts, zone: zone.playback_worker.arm(entry.song, fire_ts),
+                                 preroll=BELL_PREROLL)
+    for zone in app.zones:
+        app.bell_engine.load(zone.schedule, zone)
+    app.bell_engine.start()
+    log_message(app, "Всички задачи са планирани.")
+
+
+def stop_engine(app):
+    """Stop the bell engine and the playback workers. Touches no widgets."""
+    app.service_running = False
+    if app.bell_engine:
+        app.bell_engine.stop()
+        app.bell_engine = None
+    for zone in app.zones:
+        if zone.playback_worker:
+            zone.playback_worker.stop()
+            zone.playback_worker = None
+    disarm_zones(app)
+    stop_all_playback(app)
+
+
+def start_service(app):
+    """Start the bell scheduling service."""
     app.status_label.configure(text="РАБОТИ", text_color="#2CC985")
     app.start_stop_button.configure(text="СТОП")
     app.edit_button.configure(state="disabled")
-    app.scheduler_thread = threading.Thread(target=run_scheduler, args=(app,), daemon=True)
-    app.scheduler_thread.start()
+    start_engine(app)
 
 
 def stop_service(app):
     """Stop the bell scheduling service."""
-    app.service_running = False
-    schedule.clear()
-    from pygame import mixer
-    if mixer.music.get_busy(): 
-        mixer.music.stop()
+    stop_engine(app)
     app.status_label.configure(text="СПРЯН", text_color="#E84545")
     app.start_stop_button.configure(text="СТАРТ")
     app.next_bell_label.configure(text="--:--:--")
@@ -34,86 +214,18 @@ def stop_service(app):
     log_message(app, "Услугата е спряна.")
 
 
-def run_scheduler(app):
-    """Run the scheduler loop."""
-    log_message(app, "Планиране на задачите...")
-    schedule.clear()
-    for job in app.bell_times:
-        day_en = DAY_MAP_BG_TO_EN.get(job['day'])
-        if day_en:
-            try:
-                getattr(schedule.every(), day_en).at(job['time']).do(lambda song_name=job.get('song'): app.play_song(song_name=song_name))
-            except Exception as e:
-                log_message(app, f"[ГРЕШКА] Невалидна задача: {job['day']} в {job['time']}. Грешка: {e}")
-
-    log_message(app, "Всички задачи са планирани.")
-
-    while app.service_running:
-        schedule.run_pending()
-        time.sleep(1)
+def _next_bell_text(next_bell):
+    return f"{next_bell.day_name} в {next_bell.time}" if next_bell else "Няма предстоящи"
 
 
 def update_next_bell_label(app):
-    """Update the next bell label."""
+    """Update the next bell label, with one line per zone when there is more than one."""
     if app.service_running:
-        from datetime import datetime
-        from config import DAY_MAP_BG_TO_EN, BG_WEEKDAYS
-        import calendar
-
-        now = datetime.now()
-        current_time = now.time()
-        current_weekday = now.weekday()
-        current_day_bg = BG_WEEKDAYS[current_weekday]
-
-        # Find the next scheduled bell
-        next_bell = None
-        min_diff = float('inf')
-
-        # Check all scheduled times
-        for entry in app.bell_times:
-            day_bg = entry['day']
-            time_str = entry['time']
-
-            # Parse the time
-            try:
-                bell_time = datetime.strptime(time_str, '%H:%M').time()
-            except ValueError:
-                continue
-
-            # Calculate the difference in days and time
-            day_index = BG_WEEKDAYS.index(day_bg)
-
-            if day_index == current_weekday:
-                # Same day - check if time has passed
-                if bell_time > current_time:
-                    # Today's bell hasn't happened yet
-                    diff_seconds = (datetime.combine(now.date(), bell_time) - now).total_seconds()
-                    if 0 < diff_seconds < min_diff:
-                        min_diff = diff_seconds
-                        next_bell = (day_bg, time_str)
-            elif day_index > current_weekday:
-                # Future day in this week
-                days_ahead = day_index - current_weekday
-                temp_date = now + timedelta(days=days_ahead)
-                temp_datetime = datetime.combine(temp_date.date(), bell_time)
-                diff_seconds = (temp_datetime - now).total_seconds()
-                if diff_seconds < min_diff:
-                    min_diff = diff_seconds
-                    next_bell = (day_bg, time_str)
-            else:
-                # Day in next week
-                days_ahead = 7 - current_weekday + day_index
-                temp_date = now + timedelta(days=days_ahead)
-                temp_datetime = datetime.combine(temp_date.date(), bell_time)
-                diff_seconds = (temp_datetime - now).total_seconds()
-                if diff_seconds < min_diff:
-                    min_diff = diff_seconds
-                    next_bell = (day_bg, time_str)
-
-        if next_bell:
-            day, time_str = next_bell
-            app.next_bell_label.configure(text=f"{day} в {time_str}")
+        next_bells = zone_next_bells(app, datetime.now())
+        if len(next_bells) == 1:
+            text = _next_bell_text(next_bells[0][1])
         else:
-            app.next_bell_label.configure(text="Няма предстоящи")
+            text = "\n".join(f"{zone.name}: {_next_bell_text(next_bell)}" for zone, next_bell in next_bells)
+        app.next_bell_label.configure(text=text)
     else:
-        app.next_bell_label.configure(text="--:--:--")
\ No newline at end of file
+        app.next_bell_label.configure(text="--:--:--")
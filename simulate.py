@@ -0,0 +1,190 @@
+"""
+Simulated-clock harness for the School Bell application.
+Replays a week or a whole term of schedule.csv through the real BellEngine in seconds,
+checks that exactly the expected bells fired in order and reports the engine's CPU cost per simulated day.
+With --dst it also replays the weeks of the clock changes, with a bell inside the hour that is skipped or repeated.
+
+Usage:
+    python simulate.py [--schedule schedule.csv] [--start 2026-09-14] [--days 7] [--play] [--dst]
+"""
+import os
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")  # Never needs a sound card, also with --play
+
+import argparse
+import sys
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from clock import SimulatedClock
+from config import BG_WEEKDAYS, SCHEDULE_FILE
+from schedule_model import BellEntry, Schedule
+from scheduler import BellEngine
+from utils import read_schedule
+
+# Weeks of the clock changes, replayed by --dst in DST_TIME_ZONE with an extra bell at DST_BELL
+DST_TIME_ZONE = "Europe/Sofia"
+DST_WEEKS = [
+    ("2027-03-22", "преминаване към лятно време"),  # Sunday 03:00-04:00 does not exist
+    ("2027-10-25", "връщане към зимно време"),      # Sunday 03:00-04:00 happens twice
+]
+DST_BELL = BellEntry(6, 3 * 60 + 30)  # Sunday 03:30
+
+
+def wall_time(moment):
+    """Local time a bell due at `moment` rings at: a time skipped by the clocks going forward rings as they jump."""
+    while datetime.fromtimestamp(moment.timestamp()) != moment:
+        moment += timedelta(minutes=1)
+    return moment
+
+
+def expected_fires(schedule, start, end):
+    """Every (time, song) the schedule should ring strictly between start and end, in order."""
+    fires = []
+    day = start.date()
+    while day <= end.date():
+        for entry in schedule.day(day.weekday()):
+            moment = wall_time(datetime.combine(day, datetime.min.time()) + timedelta(minutes=entry.minute))
+            if start < moment < end:
+                fires.append((moment, entry.song))
+        day += timedelta(days=1)
+    return fires
+
+
+class RecordingSink:
+    """
+    Audio sink for the engine: records every fired bell and, if given a
+    player, also plays it. CPU spent playing is kept apart so it can be
+    subtracted from the engine's own cost.
+    """
+
+    def __init__(self, player=None):
+        self.player = player
+        self.fired = []
+        self.cpu_by_day = defaultdict(float)
+
+    def __call__(self, entry, fire_ts, zone=None):
+        moment = datetime.fromtimestamp(fire_ts)
+        self.fired.append((moment, entry.song))
+        if self.player:
+            cpu = time.thread_time()
+            self.player(entry.song, fire_ts)
+            self.cpu_by_day[moment.date()] += time.thread_time() - cpu
+
+
+def make_player():
+    """Play bells through the real audio path on whatever SDL_AUDIODRIVER is set (dummy by default)."""
+    from audio_cache import AudioCache
+    from audio_handler import init_audio, play_song
+    from bell_metrics import BellMetrics
+    from song_library import SongLibrary
+
+    errors = []
+    app = SimpleNamespace(
+        quiet_mode_enabled=False,
+        bell_metrics=BellMetrics(path=None),
+        song_library=SongLibrary(),
+        notify_bell=lambda: None,
+        log_message=lambda msg: errors.append(msg) if "[ГРЕШКА]" in msg else None,
+    )
+    app.audio_cache = AudioCache(app)
+    init_audio()
+    return (lambda song, fire_ts: play_song(app, song, fire_ts)), errors
+
+
+def replay(schedule, start, days, player=None):
+    """Run the engine over `days` simulated days. Returns (sink, clock, wall-clock seconds)."""
+    end = start + timedelta(days=days)
+    clock = SimulatedClock(start, end)
+    sink = RecordingSink(player)
+    engine = BellEngine(None, sink, clock=clock)
+    began = time.perf_counter()
+    engine.load(schedule)
+    engine.start()
+    clock.finished.wait()
+    engine.stop()
+    return sink, clock, time.perf_counter() - began
+
+
+def check_fires(fired, expected):
+    """Print the first difference between the fired and the expected bells. Returns True if they match."""
+    if fired == expected:
+        return True
+    for index, (got, want) in enumerate(zip(fired, expected)):
+        if got != want:
+            print(f"[ГРЕШКА] Звънец №{index + 1}: очакван {want[0]} ({want[1] or 'Случайна'}), "
+                  f"а прозвъня {got[0]} ({got[1] or 'Случайна'})")
+            break
+    print(f"[ГРЕШКА] Очаквани {len(expected)} звънеца, прозвъняха {len(fired)}.")
+    return False
+
+
+def check_dst(schedule):
+    """Replay DST_WEEKS in DST_TIME_ZONE with DST_BELL added to the schedule. Returns True if every week matched."""
+    if not hasattr(time, "tzset"):
+        print("[ИНФО] Смяната на часовото време не може да бъде проверена на тази система.")
+        return True
+    os.environ["TZ"] = DST_TIME_ZONE
+    time.tzset()
+    schedule = Schedule(schedule.entries + [DST_BELL])
+    ok = True
+    for start_text, label in DST_WEEKS:
+        start = datetime.strptime(start_text, "%Y-%m-%d")
+        sink, _, _ = replay(schedule, start, 7)
+        expected = expected_fires(schedule, start, start + timedelta(days=7))
+        if check_fires(sink.fired, expected):
+            print(f"OK: {label} ({start_text}, {DST_TIME_ZONE}): всички {len(expected)} звънеца прозвъняха.")
+        else:
+            ok = False
+    return ok
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Превърта графика на звънеца в симулирано време")
+    parser.add_argument("--schedule", default=SCHEDULE_FILE, help="CSV файл с графика")
+    parser.add_argument("--start", help="начална дата ГГГГ-ММ-ДД (по подразбиране понеделникът на текущата седмица)")
+    parser.add_argument("--days", type=int, default=7, help="брой симулирани дни (напр. 126 за срок)")
+    parser.add_argument("--play", action="store_true", help="пуска всеки звънец през аудио пътя (SDL dummy драйвер)")
+    parser.add_argument("--dst", action="store_true",
+                        help=f"проверява и седмиците на смяна на часовото време в {DST_TIME_ZONE}")
+    args = parser.parse_args(argv)
+
+    if args.start:
+        start = datetime.strptime(args.start, "%Y-%m-%d")
+    else:
+        today = datetime.combine(datetime.now().date(), datetime.min.time())
+        start = today - timedelta(days=today.weekday())
+
+    schedule = read_schedule(args.schedule)
+    for error in schedule.errors:
+        print(f"[ГРЕШКА] {args.schedule}, {error}")
+
+    player, player_errors = make_player() if args.play else (None, [])
+    sink, clock, elapsed = replay(schedule, start, args.days, player)
+
+    bells_by_day = defaultdict(int)
+    for moment, _ in sink.fired:
+        bells_by_day[moment.date()] += 1
+    print(f"{'ден':<24} {'звънци':>7} {'CPU мс':>9}")
+    engine_cpu = []
+    for offset in range(args.days):
+        day = (start + timedelta(days=offset)).date()
+        cpu = (clock.cpu_by_day.get(day, 0.0) - sink.cpu_by_day.get(day, 0.0)) * 1000
+        engine_cpu.append(cpu)
+        print(f"{day.isoformat()} {BG_WEEKDAYS[day.weekday()]:<13} {bells_by_day[day]:>7} {cpu:>9.2f}")
+    print(f"{args.days} симулирани дни за {elapsed:.2f} сек.; CPU на ден: средно {sum(engine_cpu) / len(engine_cpu):.2f} мс, "
+          f"макс. {max(engine_cpu):.2f} мс")
+    for msg in player_errors:
+        print(msg)
+
+    expected = expected_fires(schedule, start, start + timedelta(days=args.days))
+    if not check_fires(sink.fired, expected):
+        return 1
+    print(f"OK: всички {len(expected)} звънеца прозвъняха в точния ред и час.")
+    if args.dst and not check_dst(schedule):
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
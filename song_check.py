@@ -0,0 +1,102 @@
+"""
+Song checks for the School Bell application.
+Test-decodes every song the schedules name in a process pool, so a missing or corrupt file is reported long before its bell.
+"""
+from background_pool import BackgroundPool
+from config import SONG_CHECK_WORKERS, RESOURCES_DIR
+from utils import log_message
+
+
+def decode_check(path):
+    """Decode a file completely and return its length in seconds. Runs in a pool process."""
+    from pygame import mixer
+    if not mixer.get_init():
+        mixer.init()
+    return mixer.Sound(path).get_length()
+
+
+class SongChecker:
+    """
+    Problems found with the songs named in the zones' schedules: {song name: message}.
+
+    check() runs on a background thread and decodes, in a process pool, only
+    songs whose content hash has not been checked yet, so re-checking after
+    an edit costs almost nothing. `version` changes whenever the problems do,
+    so the UI can redraw only then. close() cancels a running check so that
+    quitting never waits for it.
+    """
+
+    def __init__(self, workers=SONG_CHECK_WORKERS):
+        self.workers = workers
+        self.problems = {}
+        self.checked = 0        # Songs covered by the last check
+        self.version = 0
+        self._results = {}      # song hash -> error message, or None if it decodes
+        self._pool = BackgroundPool()
+
+    def check(self, app):
+        """Check the scheduled songs again in the background. Never blocks."""
+        self._pool.run(self._run, app)
+
+    def _run(self, app):
+        try:
+            self._check(app)
+        except Exception as e:
+            log_message(app, f"[ГРЕШКА] Проверката на песните не можа да завърши: {e}")
+
+    def _check(self, app):
+        bells = {}  # song name -> [BellEntry], across all zones
+        has_random = False
+        for zone in app.zones:
+            for entry in zone.schedule.entries:
+                if entry.song:
+                    bells.setdefault(entry.song, []).append(entry)
+                else:
+                    has_random = True
+
+        library = app.song_library
+        problems, todo = {}, {}
+        if has_random and not library.names():
+            problems["Случайна"] = f"няма песни в '{RESOURCES_DIR}'"
+        for name in bells:
+            info = library.info(name)
+            if info is None:
+                problems[name] = "файлът липсва"
+            elif info.hash in self._results:
+                if self._results[info.hash]:
+                    problems[name] = self._results[info.hash]
+            else:
+                todo[name] = info
+
+        if todo:
+            tasks = {name: (info.path,) for name, info in todo.items()}
+            for name, future in self._pool.map(decode_check, tasks, min(self.workers, len(todo))):
+                try:
+                    error = None if future.result() > 0 else "празен файл"
+                except Exception as e:
+                    error = f"не може да бъде декодиран ({e})"
+                self._results[todo[name].hash] = error
+                if error:
+                    problems[name] = error
+            if self._pool.closed:
+                return
+
+        for name, message in problems.items():
+            if self.problems.get(name) != message:
+                entries = bells.get(name, [])
+                when = ", ".join(f"{entry.day_name} {entry.time}" for entry in entries[:3]) + ("..." if len(entries) > 3 else "")
+                log_message(app, f"[ГРЕШКА] Песен '{name}': {message}" + (f" (звънци: {when})" if when else ""))
+        if problems != self.problems or len(bells) != self.checked:
+            self.problems = problems
+            self.checked = len(bells)
+            self.version += 1
+
+    def close(self):
+        """Stop checking: queued decodes are cancelled and no new check starts. Never blocks."""
+        self._pool.close()
+
+    def summary_text(self):
+        """Human-readable result for the status panel."""
+        if not self.problems:
+            return f"Всички {self.checked} песни от графика се декодират." if self.checked else "Няма проверени песни."
+        return "\n".join(f"{name}: {message}" for name, message in sorted(self.problems.items()))
@@ -0,0 +1,154 @@
+"""
+Song library for the School Bell application.
+Scans the songs directory once and caches the listing and per-file metadata.
+"""
+import hashlib
+import os
+import random
+import threading
+import wave
+from config import RESOURCES_DIR
+
+SUPPORTED_EXTENSIONS = (".mp3", ".wav", ".ogg")
+
+
+def file_hash(path):
+    """SHA-256 of a file's contents."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for chunk in iter(lambda: file.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class SongInfo:
+    """Metadata of one song file."""
+    __slots__ = ("name", "path", "format", "size", "mtime", "_hash", "duration")
+
+    def __init__(self, name, path, size, mtime):
+        self.name = name
+        self.path = path
+        self.format = os.path.splitext(name)[1][1:].lower()
+        self.size = size
+        self.mtime = mtime
+        self._hash = None  # Reading the whole file is slow, so only the background workers ask for it
+        self.duration = None  # seconds; for MP3/OGG filled in by the transcoding sync from the WAV copy
+        if self.format == "wav":
+            try:
+                with wave.open(path, 'rb') as wav:
+                    self.duration = wav.getnframes() / wav.getframerate()
+            except (wave.Error, EOFError):
+                pass
+
+    @property
+    def hash(self):
+        """SHA-256 of the contents, computed on first use. Never ask for it on the Tk thread or the bell path."""
+        if self._hash is None:
+            self._hash = file_hash(self.path)
+        return self._hash
+
+    @property
+    def known_hash(self):
+        """The hash if it has been computed already, else None. Cheap anywhere."""
+        return self._hash
+
+
+class SongLibrary:
+    """
+    Cached listing of the songs directory.
+
+    The directory is re-scanned only when its mtime changes, i.e. when files
+    are added, removed or renamed, or with refresh(force=True), which also
+    finds files overwritten in place. Unchanged files keep their metadata.
+    With a TranscodeCache, songs are played from their WAV copies once ready;
+    with a LoudnessCache, each is played at a gain that evens out loudness.
+    """
+
+    def __init__(self, directory=RESOURCES_DIR, transcodes=None, loudness=None):
+        self.directory = directory
+        self.transcodes = transcodes
+        self.loudness = loudness
+        self.version = 0  # Bumped whenever the listing changes
+        self._songs = {}  # name -> SongInfo
+        self._names = []
+        self._dir_mtime = None
+        self._lock = threading.Lock()
+        self.refresh()
+
+    def refresh(self, force=False):
+        """Re-scan the directory if it changed. Returns True if the listing changed."""
+        try:
+            dir_mtime = os.stat(self.directory).st_mtime
+        except OSError:
+            dir_mtime = None
+        if dir_mtime == self._dir_mtime and not force:
+            return False
+
+        with self._lock:
+            songs = {}
+            if dir_mtime is not None:
+                for item in os.scandir(self.directory):
+                    if not item.is_file() or not item.name.lower().endswith(SUPPORTED_EXTENSIONS):
+                        continue
+                    stat = item.stat()
+                    known = self._songs.get(item.name)
+                    if known and known.size == stat.st_size and known.mtime == stat.st_mtime:
+                        songs[item.name] = known
+                    else:
+                        songs[item.name] = SongInfo(item.name, item.path, stat.st_size, stat.st_mtime)
+            self._dir_mtime = dir_mtime
+            changed = songs.keys() != self._songs.keys() or any(songs[n] is not self._songs[n] for n in songs)
+            self._songs = songs
+            self._names = sorted(songs)
+            if changed:
+                self.version += 1
+        return changed
+
+    def names(self):
+        """Sorted song file names."""
+        self.refresh()
+        return self._names
+
+    def __contains__(self, name):
+        self.refresh()
+        return name in self._songs
+
+    def info(self, name):
+        """SongInfo for a song file name, or None if it does not exist. A file overwritten in place gets fresh metadata."""
+        self.refresh()
+        info = self._songs.get(name)
+        if info is not None:
+            try:
+                stat = os.stat(info.path)
+                current = stat.st_size == info.size and stat.st_mtime == info.mtime
+            except OSError:
+                current = False
+            if not current:
+                self.refresh(force=True)
+                info = self._songs.get(name)
+        return info
+
+    def path(self, name):
+        return os.path.join(self.directory, name)
+
+    def playable_path(self, name):
+        """Path to play a song from: its transcoded copy if one is ready, otherwise the file itself."""
+        if self.transcodes:
+            info = self.info(name)
+            transcoded = info and self.transcodes.ready(info)
+            if transcoded:
+                return transcoded
+        return self.path(name)
+
+    def gain(self, name):
+        """Volume multiplier for a song from its measured loudness, 1.0 if not measured."""
+        if self.loudness:
+            info = self.info(name)
+            if info:
+                return self.loudness.gain(info)
+        return 1.0
+
+    def choice(self):
+        """A random song name, or None if the library is empty."""
+        names = self.names()
+        return random.choice(names) if names else None
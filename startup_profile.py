@@ -0,0 +1,57 @@
+"""
+Startup profiler for the School Bell application.
+Records how long each startup phase takes when the app is run with --profile-startup.
+"""
+import threading
+import time
+from config import STARTUP_BUDGET_MS
+
+_started = None  # perf_counter() at enable(), None while profiling is off
+_phases = []     # (phase, ms since the previous mark on the same thread group, ms since start)
+_last = {}       # group -> perf_counter() of its previous mark
+_lock = threading.Lock()
+
+
+def enable():
+    """Start profiling. Call as early as possible, before the heavy imports."""
+    global _started
+    _started = time.perf_counter()
+    _last["main"] = _started
+
+
+def enabled():
+    return _started is not None
+
+
+def mark(phase, group="main"):
+    """Record the end of a startup phase. Phases on background threads use their own group."""
+    if _started is None:
+        return
+    now = time.perf_counter()
+    with _lock:
+        previous = _last.get(group, _started)
+        _last[group] = now
+        _phases.append((phase, group, (now - previous) * 1000, (now - _started) * 1000))
+
+
+def elapsed_ms(phase):
+    """Time from enable() to the end of `phase`, or None if it has not been marked."""
+    for name, _, _, total in _phases:
+        if name == phase:
+            return total
+    return None
+
+
+def report(first_frame_phase, budget_ms=STARTUP_BUDGET_MS):
+    """Return the per-phase breakdown and whether time-to-first-frame stayed within budget."""
+    lines = [f"{'фаза':<28} {'нишка':<10} {'мс':>9} {'общо мс':>9}"]
+    for phase, group, duration, total in _phases:
+        lines.append(f"{phase:<28} {group:<10} {duration:>9.1f} {total:>9.1f}")
+    first_frame = elapsed_ms(first_frame_phase)
+    ok = first_frame is not None and first_frame <= budget_ms
+    if first_frame is None:
+        lines.append(f"Няма отметка '{first_frame_phase}'.")
+    else:
+        verdict = "в рамките на" if ok else "НАД"
+        lines.append(f"До първия кадър: {first_frame:.1f} мс ({verdict} бюджета от {budget_ms} мс)")
+    return "\n".join(lines), ok
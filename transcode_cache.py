@@ -0,0 +1,155 @@
+"""
+Transcoding cache for the School Bell application.
+Converts the songs in the background to PCM WAV at the mixer's own format, so ringing never has to decode MP3 or OGG.
+"""
+import os
+import wave
+from audio_handler import audio_ready
+from background_pool import BackgroundPool
+from config import TRANSCODE_DIR, TRANSCODE_WORKERS
+from utils import log_message
+
+
+def _lower_priority():
+    """Pool initializer: keep conversions from competing with the bell for the CPU."""
+    if hasattr(os, "nice"):
+        os.nice(10)
+
+
+def transcode_to_wav(src, dst, frequency, channels):
+    """Decode `src` and write it to `dst` as 16-bit PCM WAV. Runs in a pool process."""
+    from pygame import mixer
+    if not mixer.get_init():
+        mixer.init(frequency=frequency, size=-16, channels=channels)
+    raw = mixer.Sound(src).get_raw()
+    tmp = dst + ".tmp"
+    try:
+        with wave.open(tmp, 'wb') as wav:
+            wav.setnchannels(channels)
+            wav.setsampwidth(2)
+            wav.setframerate(frequency)
+            wav.writeframes(raw)
+        os.replace(tmp, dst)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+    return dst
+
+
+def _wav_duration(path):
+    """Length of a WAV file in seconds from its header, or None if it cannot be read."""
+    try:
+        with wave.open(path, 'rb') as wav:
+            return wav.getnframes() / wav.getframerate()
+    except (wave.Error, EOFError, OSError):
+        return None
+
+
+def _matches_format(path, frequency, channels):
+    """True if a WAV file is already 16-bit PCM in the mixer's format."""
+    try:
+        with wave.open(path, 'rb') as wav:
+            return wav.getframerate() == frequency and wav.getnchannels() == channels and wav.getsampwidth() == 2
+    except (wave.Error, EOFError, OSError):
+        return False
+
+
+class TranscodeCache:
+    """
+    WAV copies of the songs, named by content hash and mixer format.
+
+    sync() converts new or changed songs in a process pool on a background
+    thread; a song is played from its copy only once the copy is complete,
+    and from the original file until then. The copy's header also gives
+    the song's duration, which MP3 and OGG files cannot tell cheaply. The pool exists only while
+    there is work, so idle netbooks keep no extra processes around. close()
+    drops the queued conversions so that quitting never waits for them.
+    """
+
+    def __init__(self, directory=TRANSCODE_DIR, workers=TRANSCODE_WORKERS):
+        self.directory = directory
+        self.workers = workers
+        self.format = None      # (frequency, channels) of the mixer, known after init_audio()
+        self._ready = {}        # song hash -> WAV path
+        self._pool = BackgroundPool()
+
+    def path_for(self, info):
+        frequency, channels = self.format
+        return os.path.join(self.directory, f"{info.hash}-{frequency}-{channels}.wav")
+
+    def ready(self, info):
+        """Path of the finished WAV copy of a song, or None to play the original."""
+        return self._ready.get(info.known_hash)
+
+    def sync(self, app, library, on_done=None):
+        """Convert every song without a current copy, in the background, then call on_done() on that thread."""
+        if not audio_ready():
+            return  # Called again once the audio device is open
+        from pygame import mixer
+        frequency, _, channels = mixer.get_init()
+        self.format = (frequency, channels)
+        self._pool.run(self._sync, app, library, on_done)
+
+    def _sync(self, app, library, on_done):
+        converted = self._convert_missing(app, library)
+        if on_done and not self._pool.closed:
+            on_done(converted)
+
+    def _convert_missing(self, app, library):
+        # Re-stat every song here, off the Tk thread: a file overwritten in place leaves the directory mtime alone
+        library.refresh(force=True)
+        os.makedirs(self.directory, exist_ok=True)
+        frequency, channels = self.format
+        ready, todo = {}, {}
+        for name in library.names():
+            info = library.info(name)
+            if info is None or (info.format == "wav" and _matches_format(info.path, frequency, channels)):
+                continue
+            dst = self.path_for(info)
+            if os.path.exists(dst):
+                ready[info.hash] = dst
+                self._fill_duration(info, dst)
+            else:
+                todo[dst] = info
+        self._prune(set(ready) | {info.hash for info in todo.values()})
+        self._ready = ready
+        if not todo:
+            return 0
+
+        log_message(app, f"Преобразуване на {len(todo)} песни във WAV във фонов режим...")
+        converted = 0
+        tasks = {dst: (info.path, dst, frequency, channels) for dst, info in todo.items()}
+        for dst, future in self._pool.map(transcode_to_wav, tasks, self.workers, initializer=_lower_priority):
+            info = todo[dst]
+            try:
+                future.result()
+            except Exception as e:
+                log_message(app, f"[ГРЕШКА] '{info.name}' не може да бъде преобразувана: {e}")
+                continue
+            self._ready = {**self._ready, info.hash: dst}
+            self._fill_duration(info, dst)
+            converted += 1
+        if self._pool.closed:
+            return converted
+        log_message(app, f"Преобразувани песни: {converted} от {len(todo)}.")
+        return converted
+
+    @staticmethod
+    def _fill_duration(info, dst):
+        if info.duration is None:
+            info.duration = _wav_duration(dst)
+
+    def close(self):
+        """Stop converting: queued songs are cancelled and no new sync starts. Never blocks."""
+        self._pool.close()
+
+    def _prune(self, wanted_hashes):
+        """Delete copies of songs that were removed or changed, and copies in another mixer format."""
+        keep = {f"{song_hash}-{self.format[0]}-{self.format[1]}.wav" for song_hash in wanted_hashes}
+        for item in os.scandir(self.directory):
+            if item.is_file() and item.name.endswith((".wav", ".wav.tmp")) and item.name not in keep:
+                try:
+                    os.remove(item.path)
+                except OSError:
+                    pass
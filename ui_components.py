@@ -5,6 +5,7 @@ import customtkinter
 from tkinter import Canvas, Text, WORD
 from config import GREEN, RED, BLUE, BG_WEEKDAYS
 from datetime import datetime
+from log_view import LogView
 
 
 def setup_left_panel(app):
@@ -61,9 +62,6 @@ def setup_left_panel(app):
     app.start_stop_button = customtkinter.CTkButton(app.left_panel, text="СТАРТ", command=app.toggle_service)
     app.start_stop_button.grid(row=11, column=0, padx=20, pady=20, sticky="sew")
 
-    disclaimer_label = customtkinter.CTkLabel(app.left_panel, text="Важно: При промяна/добавяне на песни, рестартирайте програмата.", font=customtkinter.CTkFont(size=11, slant="italic"), text_color="yellow", wraplength=250)
-    disclaimer_label.grid(row=12, column=0, padx=20, pady=(0, 10), sticky="s")
-
     app.about_button = customtkinter.CTkButton(app.left_panel, text="Относно", command=app.show_about, fg_color="transparent", hover_color="#555555", width=60)
     app.about_button.grid(row=13, column=0, padx=20, pady=(0, 20), sticky="s")
 
@@ -78,6 +76,7 @@ def setup_center_panel(app):
 
     app.log_box.tag_config('timestamp', foreground='orange')
     app.log_box.tag_config('message', foreground='white')
+    app.log_view = LogView(app, app.log_box)
 
 
 def setup_right_panel(app):
@@ -90,4 +89,18 @@ def setup_right_panel(app):
     app.schedule_display_title = customtkinter.CTkLabel(app.right_panel, text="", font=customtkinter.CTkFont(size=16, weight="bold"))
     app.schedule_display_title.grid(row=0, column=0, padx=10, pady=(10, 10), sticky="w")
     app.schedule_display_frame = customtkinter.CTkScrollableFrame(app.right_panel, fg_color="transparent")
-    app.schedule_display_frame.grid(row=1, column=0, sticky="nsew", padx=10)
\ No newline at end of file
+    app.schedule_display_frame.grid(row=1, column=0, sticky="nsew", padx=10)
+    # Row labels are kept and reconfigured by populate_schedule_display instead of being rebuilt
+    app.schedule_display_font = customtkinter.CTkFont(size=14)
+    app.schedule_display_next_font = customtkinter.CTkFont(size=14, weight="bold")
+    app.schedule_display_labels = []
+    app.schedule_display_empty_label = customtkinter.CTkLabel(app.schedule_display_frame, text="Няма звънци за днес.")
+
+    customtkinter.CTkLabel(app.right_panel, text="Точност на звънците:", font=customtkinter.CTkFont(size=14, weight="bold")).grid(row=2, column=0, padx=10, pady=(10, 0), sticky="w")
+    app.bell_metrics_label = customtkinter.CTkLabel(app.right_panel, text="", font=customtkinter.CTkFont(size=12), justify="left")
+    app.bell_metrics_label.grid(row=3, column=0, padx=10, pady=(0, 10), sticky="w")
+    customtkinter.CTkLabel(app.right_panel, text="Песни в графика:", font=customtkinter.CTkFont(size=14, weight="bold")).grid(row=4, column=0, padx=10, pady=(10, 0), sticky="w")
+    app.song_check_label = customtkinter.CTkLabel(app.right_panel, text="Проверка...", font=customtkinter.CTkFont(size=12), justify="left")
+    app.song_check_label.grid(row=5, column=0, padx=10, pady=(0, 10), sticky="w")
+    app.ui_dispatch_label = customtkinter.CTkLabel(app.right_panel, text="", font=customtkinter.CTkFont(size=11), text_color="gray")
+    app.ui_dispatch_label.grid(row=6, column=0, padx=10, pady=(0, 10), sticky="w")
\ No newline at end of file
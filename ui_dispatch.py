@@ -0,0 +1,71 @@
+"""
+Thread-safe UI dispatcher for the School Bell application.
+Lets worker threads request widget updates that are then run on the Tk thread.
+"""
+import threading
+import time
+from collections import deque
+from config import UI_DISPATCH_INTERVAL_MS
+
+
+class UIDispatcher:
+    """
+    Queue of UI callbacks drained on the Tk thread through `after`.
+
+    Updates posted with the same `key` are coalesced: only the latest one
+    runs, at the position of the first. Calls made on the Tk thread itself
+    run immediately.
+    """
+
+    def __init__(self, app, interval=UI_DISPATCH_INTERVAL_MS):
+        self.app = app
+        self.interval = interval
+        self._queue = deque()  # (posted_at, key, fn, args)
+        self._keyed = {}       # key -> (fn, args) of the latest update for a queued key
+        self._lock = threading.Lock()
+        self.coalesced = 0
+        self.last_latency_ms = 0.0  # Oldest item's wait in the most recent non-empty drain
+        self.max_latency_ms = 0.0
+        self.app.after(self.interval, self.drain)
+
+    def post(self, fn, *args, key=None):
+        """Run fn(*args) on the Tk thread. Safe to call from any thread."""
+        if threading.current_thread() is threading.main_thread():
+            fn(*args)
+            return
+        with self._lock:
+            if key is not None:
+                if key in self._keyed:
+                    self.coalesced += 1
+                else:
+                    self._queue.append((time.perf_counter(), key, None, None))
+                self._keyed[key] = (fn, args)
+            else:
+                self._queue.append((time.perf_counter(), None, fn, args))
+
+    @property
+    def depth(self):
+        return len(self._queue)
+
+    def drain(self):
+        """Run every queued update. Called on the Tk thread."""
+        with self._lock:
+            items = list(self._queue)
+            self._queue.clear()
+            keyed, self._keyed = self._keyed, {}
+        if items:
+            latency = (time.perf_counter() - items[0][0]) * 1000
+            self.last_latency_ms = latency
+            self.max_latency_ms = max(self.max_latency_ms, latency)
+        for _, key, fn, args in items:
+            if key is not None:
+                fn, args = keyed[key]
+            try:
+                fn(*args)
+            except Exception as e:
+                print(f"[LOG] [ГРЕШКА] при обновяване на интерфейса: {e}")
+        self.app.after(self.interval, self.drain)
+
+    def stats_text(self):
+        return (f"Опашка: {self.depth} · забавяне {self.last_latency_ms:.0f} ms "
+                f"(max {self.max_latency_ms:.0f} ms) · обединени {self.coalesced}")
@@ -2,54 +2,156 @@
 Utility functions for the School Bell application.
 """
 import csv
+import hashlib
+import io
+import json
 import os
-from datetime import datetime
-from tkinter import END
-from config import SCHEDULE_FILE
+import shutil
+import tempfile
+from config import SCHEDULE_FILE, SCHEDULE_BACKUPS, SCHEDULE_CACHE_VERSION
+from schedule_model import Schedule, ScheduleError, compile_rows
 
 
-def load_schedule():
-    """Load the bell schedule from the CSV file."""
-    schedule_data = []
+def _atomic_write(path, write):
+    """
+    Write a file so that it is either fully replaced or left untouched.
+
+    `write` receives a text file object. The data goes to a temporary file in
+    the same directory, is fsynced and then renamed over `path`. The file keeps
+    the mode of the one it replaces, or gets the umask default if it is new.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(prefix=f".{os.path.basename(path)}.", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, mode='w', newline='', encoding='utf-8') as file:
+            write(file)
+            file.flush()
+            os.fsync(file.fileno())
+        _copy_mode(path, tmp_path)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    if hasattr(os, 'O_DIRECTORY'):
+        # Make the rename itself durable (not supported on Windows)
+        dir_fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+
+
+def _copy_mode(path, tmp_path):
+    """Give tmp_path the permissions of path, or those of a newly created file; mkstemp makes it 0600."""
+    if os.path.exists(path):
+        shutil.copymode(path, tmp_path)
+    else:
+        umask = os.umask(0)
+        os.umask(umask)
+        os.chmod(tmp_path, 0o666 & ~umask)
+
+
+def _rotate_backups(path, count=SCHEDULE_BACKUPS):
+    """Keep the last `count` versions of a file as path.bak1 (newest) .. path.bakN."""
+    if count < 1 or not os.path.exists(path):
+        return
+    for i in range(count - 1, 0, -1):
+        if os.path.exists(f"{path}.bak{i}"):
+            os.replace(f"{path}.bak{i}", f"{path}.bak{i + 1}")
+    shutil.copy2(path, f"{path}.bak1")
+
+
+def _cache_path(path):
+    return f"{path}.cache.json"
+
+
+def _cache_key(path, data):
+    return [os.stat(path).st_mtime_ns, hashlib.sha256(data).hexdigest()]
+
+
+def _write_schedule_cache(path, key, compiled):
+    """Store a compiled schedule next to the CSV so the next start can skip parsing it."""
+    try:
+        payload = dict(compiled, version=SCHEDULE_CACHE_VERSION, key=key)
+        _atomic_write(_cache_path(path), lambda file: json.dump(payload, file, ensure_ascii=False))
+    except OSError as e:
+        print(f"[LOG] [ГРЕШКА] при запис на {_cache_path(path)}: {e}")
+
+
+def _read_schedule_cache(path, key):
+    try:
+        with open(_cache_path(path), mode='r', encoding='utf-8') as file:
+            payload = json.load(file)
+        if payload.get('version') == SCHEDULE_CACHE_VERSION and payload.get('key') == key:
+            return Schedule.from_compiled(payload)
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+    return None
+
+
+def read_schedule(path=SCHEDULE_FILE):
+    """
+    Parse and compile a schedule CSV. Raises if the file is missing or malformed.
+
+    If the compiled sidecar cache matches the file's mtime and content hash,
+    it is used instead of parsing and validating the CSV again.
+    """
+    with open(path, mode='rb') as file:
+        data = file.read()
+    key = _cache_key(path, data)
+    cached = _read_schedule_cache(path, key)
+    if cached is not None:
+        return cached
+
+    rows = []
+    reader = csv.DictReader(io.StringIO(data.decode('utf-8-sig'), newline=''))
+    fieldnames = reader.fieldnames or []
+    if 'Ден' not in fieldnames or 'Час' not in fieldnames:
+        raise ValueError("липсва заглавен ред 'Ден,Час,Песен'")
+    has_song = 'Песен' in fieldnames
+    for row in reader:
+        rows.append((reader.line_num, row.get('Ден'), row.get('Час'), row.get('Песен') if has_song else None))
+    schedule = compile_rows(rows)
+    _write_schedule_cache(path, key, schedule.to_compiled())
+    return schedule
+
+
+def load_schedule(path=SCHEDULE_FILE):
+    """Load the bell schedule from the CSV file and compile it."""
     try:
-        with open(SCHEDULE_FILE, mode='r', newline='', encoding='utf-8') as file:
-            reader = csv.DictReader(file)
-            fieldnames = reader.fieldnames
-            for row in reader:
-                entry = {'day': row['Ден'], 'time': row['Час']}
-                if 'Песен' in fieldnames:
-                    entry['song'] = row.get('Песен') if row.get('Песен') else None
-                else:
-                    entry['song'] = None
-                schedule_data.append(entry)
+        return read_schedule(path)
     except FileNotFoundError:
-        print(f"[LOG] [ИНФО] {SCHEDULE_FILE} не е намерен, създавам нов.")
-        save_schedule([])
+        print(f"[LOG] [ИНФО] {path} не е намерен, създавам нов.")
+        save_schedule(Schedule(), path)
     except Exception as e:
-        print(f"[LOG] [ГРЕШКА] при зареждане на {SCHEDULE_FILE}: {e}")
-    return schedule_data
+        print(f"[LOG] [ГРЕШКА] при зареждане на {path}: {e}")
+        return Schedule(errors=[ScheduleError(None, str(e))])
+    return Schedule()
+
 
+def save_schedule(schedule, path=SCHEDULE_FILE):
+    """Atomically save a compiled bell schedule to the CSV file, keeping rolling backups."""
+    def write(file):
+        writer = csv.DictWriter(file, fieldnames=['Ден', 'Час', 'Песен'])
+        writer.writeheader()
+        writer.writerows(schedule.to_rows())
 
-def save_schedule(schedule_data):
-    """Save the bell schedule to the CSV file."""
     try:
-        with open(SCHEDULE_FILE, mode='w', newline='', encoding='utf-8') as file:
-            writer = csv.DictWriter(file, fieldnames=['Ден', 'Час', 'Песен'])
-            writer.writeheader()
-            writer.writerows([{'Ден': r['day'], 'Час': r['time'], 'Песен': r.get('song')} for r in schedule_data])
+        _rotate_backups(path)
+        _atomic_write(path, write)
+        # The written file is clean: one row per entry after the header, nothing to report
+        compiled = {'entries': [(e.day, e.minute, e.song, row) for row, e in enumerate(schedule.entries, start=2)], 'errors': []}
+        with open(path, mode='rb') as file:
+            _write_schedule_cache(path, _cache_key(path, file.read()), compiled)
     except Exception as e:
-        print(f"[LOG] [ГРЕШКА] при запазване на {SCHEDULE_FILE}: {e}")
+        print(f"[LOG] [ГРЕШКА] при запазване на {path}: {e}")
 
 
 def log_message(app, msg):
-    """Log a message to the application's log box."""
+    """Log a message to the application's log view and log file."""
     if app is None:
         print(f"[LOG] {msg}")
         return
 
-    now = datetime.now().strftime("%H:%M:%S")
-    app.log_box.config(state="normal")
-    app.log_box.insert(END, f"[{now}] ", 'timestamp')
-    app.log_box.insert(END, f"{msg}\n", 'message')
-    app.log_box.config(state="disabled")
-    app.log_box.see(END)
\ No newline at end of file
+    app.log_view.append(msg)
@@ -0,0 +1,123 @@
+"""
+Virtualized list widget for the School Bell application.
+Only builds widgets for the visible rows and re-binds them to other items while scrolling.
+"""
+import customtkinter
+
+WHEEL_ROWS = 3  # Rows scrolled per mouse wheel notch
+
+
+class VirtualList(customtkinter.CTkFrame):
+    """
+    Scrolling list backed by a small pool of fixed-height row widgets.
+
+    Args:
+        master: Parent widget
+        row_height (int): Height of every row in pixels
+        make_row (callable): make_row(parent) -> new row widget
+        bind_row (callable): bind_row(row, item) shows `item` in an existing row
+        label_text (str): Optional caption above the list
+    """
+
+    def __init__(self, master, row_height, make_row, bind_row, label_text=None, **kwargs):
+        super().__init__(master, **kwargs)
+        self.row_height = row_height
+        self.make_row = make_row
+        self.bind_row = bind_row
+        self.items = []
+        self.first = 0      # Index of the item shown in the top row
+        self.rows = []      # Pooled row widgets
+        self.bound = []     # Item currently shown by each pooled row, None if hidden
+        self.visible = 1
+
+        self.grid_columnconfigure(0, weight=1)
+        self.grid_rowconfigure(1, weight=1)
+        if label_text:
+            customtkinter.CTkLabel(self, text=label_text).grid(row=0, column=0, columnspan=2, sticky="ew", pady=(2, 0))
+
+        self.body = customtkinter.CTkFrame(self, fg_color="transparent")
+        self.body.grid(row=1, column=0, sticky="nsew")
+        self.body.grid_columnconfigure(0, weight=1)
+        self.scrollbar = customtkinter.CTkScrollbar(self, command=self._on_scrollbar)
+        self.scrollbar.grid(row=1, column=1, sticky="ns")
+
+        self.body.bind("<Configure>", self._on_resize)
+        # Wheel events reach the toplevel from every descendant; the binding goes away with the window
+        toplevel = self.winfo_toplevel()
+        for sequence in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+            toplevel.bind(sequence, self._on_mousewheel, add="+")
+
+    def set_items(self, items, scroll_to_top=False):
+        """Show a new list of items. Rows whose item did not change are left untouched."""
+        self.items = items
+        if scroll_to_top:
+            self.first = 0
+        self._render()
+
+    def refresh(self, items=None):
+        """Re-bind the visible rows showing `items` (all visible rows if None) after their data changed."""
+        for i, item in enumerate(self.bound):
+            if item is not None and (items is None or item in items):
+                self.bind_row(self.rows[i], item)
+
+    def row_for(self, item):
+        """The row widget currently showing `item`, or None if it is scrolled out of view."""
+        for row, bound in zip(self.rows, self.bound):
+            if bound is item:
+                return row
+        return None
+
+    def _render(self):
+        count = len(self.items)
+        self.first = max(0, min(self.first, count - self.visible))
+        while len(self.rows) < min(self.visible, count):
+            row = self.make_row(self.body)
+            row.configure(height=self.row_height)
+            row.grid_propagate(False)
+            self.rows.append(row)
+            self.bound.append(None)
+
+        for i, row in enumerate(self.rows):
+            index = self.first + i
+            if i < self.visible and index < count:
+                item = self.items[index]
+                if self.bound[i] is None:
+                    row.grid(row=i, column=0, sticky="ew", padx=5, pady=0)
+                if self.bound[i] is not item:
+                    self.bind_row(row, item)
+                    self.bound[i] = item
+            elif self.bound[i] is not None:
+                row.grid_remove()
+                self.bound[i] = None
+
+        if count:
+            self.scrollbar.set(self.first / count, min(1.0, (self.first + self.visible) / count))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+
+    def _scroll_to(self, first):
+        first = max(0, min(first, len(self.items) - self.visible))
+        if first != self.first:
+            self.first = first
+            self._render()
+
+    def _on_resize(self, event):
+        visible = max(1, event.height // self.row_height)
+        if visible != self.visible:
+            self.visible = visible
+            self._render()
+
+    def _on_scrollbar(self, action, amount, unit=None):
+        if action == "moveto":
+            self._scroll_to(round(float(amount) * len(self.items)))
+        elif action == "scroll":
+            step = self.visible if unit == "pages" else 1
+            self._scroll_to(self.first + int(amount) * step)
+
+    def _on_mousewheel(self, event):
+        if not str(event.widget).startswith(str(self)):
+            return
+        if event.num == 4 or getattr(event, "delta", 0) > 0:
+            self._scroll_to(self.first - WHEEL_ROWS)
+        else:
+            self._scroll_to(self.first + WHEEL_ROWS)
@@ -11,21 +11,17 @@ class VisualNotification:
         self.notification_window = None
         self.bring_to_front_id = None  # Track the after ID for cancelling
         self.auto_close_id = None  # Track the auto-close after ID for cancelling
-        
-    def show_visual_notification(self, message="Време е за звънец!", duration=5000):
-        """
-        Show a visual notification window.
-        
-        Args:
-            message (str): The message to display
-            duration (int): Duration in milliseconds before auto-closing
-        """
-        # Close any existing notification
+        self.time_label = None
+        self.prepared = False  # The window is built and withdrawn, waiting for show_visual_notification()
+
+    def prepare(self, message="Време е за звънец!"):
+        """Build the notification window hidden, so showing it at ring time only has to map it."""
         if self.notification_window and self.notification_window.winfo_exists():
-            self.close_notification()
-            
-        # Create a new notification window
+            return  # Already prepared, or the last bell's notification is still up; showing handles both
+
+        # Create a new notification window, hidden until the bell rings
         self.notification_window = customtkinter.CTkToplevel(self.parent_app)
+        self.notification_window.withdraw()
         self.notification_window.title("Училищен Звънец - Уведомление")
         self.notification_window.geometry("400x200")
         self.notification_window.resizable(False, False)
@@ -55,15 +51,32 @@ class VisualNotification:
         )
         label.pack(expand=True, pady=20, padx=20)
         
-        # Add time indicator
-        time_label = customtkinter.CTkLabel(
+        # Add time indicator; the time is filled in when the notification is shown
+        self.time_label = customtkinter.CTkLabel(
             main_frame,
-            text=datetime.now().strftime("%H:%M:%S"),
+            text="",
             font=customtkinter.CTkFont(size=14),
             text_color="white"
         )
-        time_label.pack(side="bottom", pady=(0, 10))
+        self.time_label.pack(side="bottom", pady=(0, 10))
+        self.prepared = True
+
+    def show_visual_notification(self, message="Време е за звънец!", duration=5000):
+        """
+        Show a visual notification window, using the one built by prepare() if there is one.
         
+        Args:
+            message (str): The message to display
+            duration (int): Duration in milliseconds before auto-closing
+        """
+        if not self.prepared:
+            # Close any existing notification
+            self.close_notification()
+            self.prepare(message)
+        self.prepared = False
+        self.time_label.configure(text=datetime.now().strftime("%H:%M:%S"))
+        self.notification_window.deiconify()
+
         # Store the auto-close after ID to be able to cancel it later
         self.auto_close_id = self.notification_window.after(duration, self.close_notification)
         
@@ -122,6 +135,22 @@ class VisualNotification:
         if self.notification_window and self.notification_window.winfo_exists():
             self.notification_window.destroy()
         self.notification_window = None
+        self.time_label = None
+        self.prepared = False
+
+
+BELL_MESSAGE = "🔔 Време е за звънец! 🔔"
+
+
+def _notifier(app):
+    if not hasattr(app, 'visual_notifier'):
+        app.visual_notifier = VisualNotification(app)
+    return app.visual_notifier
+
+
+def prepare_visual_bell_notification(app):
+    """Build the bell notification window hidden ahead of a bell, so ringing only has to show it."""
+    _notifier(app).prepare(BELL_MESSAGE)
 
 
 def show_visual_bell_notification(app):
@@ -131,7 +160,4 @@ def show_visual_bell_notification(app):
     Args:
         app: The main application instance
     """
-    if not hasattr(app, 'visual_notifier'):
-        app.visual_notifier = VisualNotification(app)
-    
-    app.visual_notifier.show_visual_notification(message="🔔 Време е за звънец! 🔔")
\ No newline at end of file
+    _notifier(app).show_visual_notification(message=BELL_MESSAGE)
\ No newline at end of file
@@ -0,0 +1,112 @@
+"""
+Zones for the School Bell application.
+Each zone is a named group of speakers with its own schedule file, mixer channel and playback controller.
+"""
+import queue
+from audio_handler import audio_ready
+from config import ZONES, OVERLAP_POLICY
+from playback_controller import PlaybackController
+from schedule_model import Schedule
+from schedule_watcher import ScheduleWatcher
+from utils import load_schedule, log_message
+
+
+class Zone:
+    """A named zone. Zone 0 is the primary one: it owns the today panel, the editor and manual bells."""
+
+    def __init__(self, name, path, channel, policy=OVERLAP_POLICY):
+        self.name = name
+        self.path = path
+        self.channel = channel  # Mixer channel index; bells in different zones play in parallel
+        self.policy = policy    # What a bell does while the zone is still playing, see OVERLAP_POLICY
+        self.schedule = Schedule()
+        self.watcher = None
+        self.playback = None         # PlaybackController for the zone's channel
+        self.playback_worker = None
+
+
+def setup_zones(app, zones=ZONES):
+    """Create app.zones from config, load every zone's schedule and start watching the files."""
+    app.zones = [Zone(*zone[:2], channel, *zone[2:]) for channel, zone in enumerate(zones)]
+    for zone in app.zones:
+        zone.playback = PlaybackController(app, zone.channel)
+        set_zone_schedule(app, zone, load_schedule(zone.path))
+        zone.watcher = ScheduleWatcher(app, zone.path)
+        zone.watcher.start()
+
+
+def set_zone_schedule(app, zone, schedule):
+    """Replace a zone's compiled schedule and report any problems found while compiling it."""
+    zone.schedule = schedule
+    if zone is app.zones[0]:
+        app.schedule = schedule
+    for error in schedule.errors:
+        log_message(app, f"[ГРЕШКА] {zone.path}, {error}")
+    if audio_ready():
+        # Before that, startup is still in progress and runs both once the audio device is open
+        preload_zone_songs(app, [zone])
+        app.song_checker.check(app)
+
+
+def preload_zone_songs(app, zones=None):
+    """Decode the songs the zones' schedules name ahead of time so those bells start from RAM."""
+    songs = {entry.song for zone in (zones or app.zones) for entry in zone.schedule.entries if entry.song}
+    library = app.song_library
+    paths = []
+    for song in sorted(songs):
+        if song in library:
+            path = library.playable_path(song)
+            if path != library.path(song):
+                app.audio_cache.discard(library.path(song))  # Its transcoded copy is played from now on
+            paths.append(path)
+    app.audio_cache.preload(paths)
+
+
+def reload_zone(app, zone, schedule=None):
+    set_zone_schedule(app, zone, schedule if schedule is not None else load_schedule(zone.path))
+    log_message(app, f"Програмата е презаредена от {zone.path}.")
+    apply_zone_to_service(app, zone)
+
+
+def apply_zone_to_service(app, zone):
+    """Hand a zone's current schedule to the running bell engine; playback is left untouched."""
+    if app.service_running and app.bell_engine:
+        # Bells armed from the old schedule are dropped; the engine pre-rolls the new one again
+        zone.playback.disarm()
+        added, removed = app.bell_engine.apply(zone.schedule, zone)
+        log_message(app, f"Програмата на зона '{zone.name}' е обновена: {added} добавени, {removed} премахнати звънеца.")
+
+
+def process_zone_reloads(app):
+    """Apply the schedule file changes found by the zones' watchers."""
+    for zone in app.zones:
+        try:
+            while True:
+                schedule = zone.watcher.reloads.get_nowait()
+                log_message(app, f"Открита е промяна в {zone.path}. Презареждане...")
+                reload_zone(app, zone, schedule)
+        except queue.Empty:
+            pass
+
+
+def stop_zone_watchers(app):
+    for zone in app.zones:
+        zone.watcher.stop()
+
+
+def stop_all_playback(app):
+    """Silence every zone and the priority channel."""
+    for zone in app.zones:
+        zone.playback.stop()
+    app.priority_playback.stop()
+
+
+def disarm_zones(app):
+    """Drop every bell loaded ahead of time, e.g. when quiet mode is turned on."""
+    for zone in app.zones:
+        zone.playback.disarm()
+
+
+def zone_next_bells(app, now):
+    """(zone, next BellEntry or None) for every zone."""
+    return [(zone, zone.schedule.next_after(now)) for zone in app.zones]